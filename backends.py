@@ -0,0 +1,233 @@
+"""
+Motores de traducción intercambiables (--backend).
+
+Todos comparten la misma interfaz:
+- translate(texto)         → traducción de un texto; lanza excepción si falla
+- translate_batch(textos)  → una petición por texto; los errores se devuelven
+                             en su posición en lugar de propagarse
+- max_chars                → tamaño máximo de una petición
+- idiomas()                → códigos de idioma soportados (None = cualquiera)
+- metricas                 → si se da, cada petición anota su latencia,
+                             caracteres y error (ver metricas.py)
+- reintentos, interruptor  → si se dan, los errores pasajeros se reintentan
+                             con backoff y, si el servidor limita, se pausa a
+                             todos los workers (ver reintentos.py)
+
+Motores disponibles:
+- google        deep-translator, una petición cada vez (por defecto)
+- google-async  cliente asyncio propio con N peticiones simultáneas
+- mock          sin red, determinista y con latencia configurable; sirve para
+                medir el resto del pipeline y para pruebas de carga
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+
+from limitador import LimitadorTasa
+from metricas import Metricas
+from reintentos import Interruptor, PoliticaReintentos
+
+
+class Backend:
+    nombre = ""
+    motor = ""  # backends que dan las mismas traducciones comparten motor
+    max_chars = 5000
+    # True si translate_batch lanza las peticiones a la vez: el pipeline le
+    # pasa entonces varios lotes juntos
+    concurrente = False
+
+    def __init__(
+        self,
+        origen: str,
+        destino: str,
+        limitador: LimitadorTasa | None = None,
+        metricas: Metricas | None = None,
+        reintentos: PoliticaReintentos | None = None,
+        interruptor: Interruptor | None = None,
+        **_,
+    ) -> None:
+        self.origen = origen
+        self.destino = destino
+        self.limitador = limitador
+        self.metricas = metricas
+        self.reintentos = reintentos
+        self.interruptor = interruptor
+
+    def _traduce(self, texto: str) -> str | None:
+        raise NotImplementedError
+
+    def idiomas(self) -> set[str] | None:
+        return None
+
+    def translate(self, texto: str) -> str:
+        intento = 0
+        while True:
+            try:
+                return self._intenta(texto)
+            except Exception as exc:
+                if self.reintentos is None or not self.reintentos.reintenta(
+                    exc, intento
+                ):
+                    raise
+                if self.metricas is not None:
+                    self.metricas.reintento(type(exc).__name__)
+                time.sleep(self.reintentos.espera(intento))
+                intento += 1
+
+    def _intenta(self, texto: str) -> str:
+        """Una sola petición (sin reintentos)."""
+        if self.interruptor is not None:
+            self.interruptor.espera()
+        if self.limitador is not None:
+            self.limitador.adquiere()
+        inicio = time.perf_counter()
+        try:
+            trad = self._traduce(texto)
+            if trad is None:
+                raise ValueError("vacío")
+        except Exception as exc:
+            if self.metricas is not None:
+                self.metricas.peticion(
+                    time.perf_counter() - inicio, texto, None, exc, self.destino
+                )
+            if self.limitador is not None:
+                self.limitador.fallo()
+            if self.interruptor is not None:
+                self.interruptor.fallo(exc)
+            raise
+        if self.metricas is not None:
+            self.metricas.peticion(
+                time.perf_counter() - inicio, texto, trad, None, self.destino
+            )
+        if self.limitador is not None:
+            self.limitador.exito()
+        if self.interruptor is not None:
+            self.interruptor.exito()
+        return trad
+
+    def translate_batch(self, textos: list[str]) -> list[str | Exception]:
+        resultados: list[str | Exception] = []
+        for texto in textos:
+            try:
+                resultados.append(self.translate(texto))
+            except Exception as exc:
+                resultados.append(exc)
+        return resultados
+
+    def cierra(self) -> None:
+        pass
+
+
+class BackendGoogle(Backend):
+    nombre = "google"
+    motor = "google"
+
+    def __init__(self, origen, destino, limitador=None, **opciones) -> None:
+        super().__init__(origen, destino, limitador, **opciones)
+        self._hilo = threading.local()
+
+    def _traduce(self, texto: str) -> str | None:
+        # GoogleTranslator guarda los parámetros de la petición en la
+        # instancia, así que cada hilo de trabajo necesita la suya
+        if not hasattr(self._hilo, "tr"):
+            from deep_translator import GoogleTranslator
+
+            self._hilo.tr = GoogleTranslator(source=self.origen, target=self.destino)
+        trad = self._hilo.tr.translate(texto)
+        # deep-translator devuelve None cuando la traducción es igual al texto
+        # (nombres propios, "OK"...): no es un error
+        return texto.strip() if trad is None else trad
+
+    def idiomas(self) -> set[str]:
+        from deep_translator.constants import GOOGLE_LANGUAGES_TO_CODES
+
+        return set(GOOGLE_LANGUAGES_TO_CODES.values())
+
+
+class BackendGoogleAsync(BackendGoogle):
+    nombre = "google-async"
+    concurrente = True
+
+    def __init__(self, origen, destino, limitador=None, en_vuelo: int = 4, **opciones):
+        super().__init__(origen, destino, limitador, **opciones)
+        from traductor_async import GoogleAsync
+
+        self.en_vuelo = en_vuelo
+        self._cliente = GoogleAsync(
+            origen,
+            destino,
+            en_vuelo,
+            limitador,
+            metricas=self.metricas,
+            reintentos=self.reintentos,
+            interruptor=self.interruptor,
+        )
+
+    # el cliente asyncio ya aplica limitador, reintentos, interruptor y
+    # métricas en cada petición
+    def translate(self, texto: str) -> str:
+        return self._cliente.translate(texto)
+
+    def translate_batch(self, textos: list[str]) -> list[str | Exception]:
+        return self._cliente.translate_batch(textos)
+
+    def cierra(self) -> None:
+        self._cliente.cierra()
+
+
+class BackendMock(Backend):
+    """Invierte cada palabra (sin tocar marcas ⟦N⟧, números ni separadores).
+
+    La latencia por petición es `latencia + len(texto) * latencia_char`.
+    """
+
+    nombre = "mock"
+    motor = "mock"
+    RE_PALABRA = re.compile(r"[A-Za-z]+")
+
+    def __init__(
+        self,
+        origen,
+        destino,
+        limitador=None,
+        latencia: float = 0.0,
+        latencia_char: float = 0.0,
+        **opciones,
+    ) -> None:
+        super().__init__(origen, destino, limitador, **opciones)
+        self.latencia = latencia
+        self.latencia_char = latencia_char
+        self.peticiones = 0
+        self._lock = threading.Lock()
+
+    def _traduce(self, texto: str) -> str:
+        with self._lock:
+            self.peticiones += 1
+        espera = self.latencia + len(texto) * self.latencia_char
+        if espera > 0:
+            time.sleep(espera)
+        return self.RE_PALABRA.sub(lambda m: m.group(0)[::-1], texto.strip())
+
+
+BACKENDS: dict[str, type[Backend]] = {
+    b.nombre: b for b in (BackendGoogle, BackendGoogleAsync, BackendMock)
+}
+
+
+def crea_backend(
+    nombre: str,
+    origen: str,
+    destino: str,
+    limitador: LimitadorTasa | None = None,
+    **opciones,
+) -> Backend:
+    try:
+        clase = BACKENDS[nombre]
+    except KeyError:
+        raise ValueError(
+            f"backend desconocido: {nombre} (opciones: {', '.join(BACKENDS)})"
+        ) from None
+    return clase(origen, destino, limitador, **opciones)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline de traducción con corpus sintéticos.
+
+Genera un árbol de subtítulos VTT/SRT (nº de archivos, cues por archivo, largo
+de cue, tasa de repetición y densidad de tokens de código configurables) y lo
+traduce con `traduce.py --backend mock` en un proceso aparte. Mide:
+
+- rendimiento de punta a punta (archivos/s, cues/s, caracteres/s)
+- tiempo por etapa (descubrir, leer, proteger, traducir, escribir), sacado del
+  resumen de --metrics
+- pico de memoria del proceso (ru_maxrss)
+
+Cada ejecución añade una línea JSON a --salida (por defecto bench_output.txt)
+con la versión (git) y los parámetros, para comparar versiones entre sí.
+
+Ejecutar: python bench_traduce.py --archivos 200 --cues 300 --repeticion 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: sin pico de memoria
+    resource = None
+
+AQUI = Path(__file__).resolve().parent
+PALABRAS = (
+    "so now we are going to open the file and look at what this function does "
+    "before we move on let me show you how the compiler handles it here you "
+    "can see that every value has a type and the loop keeps running until the "
+    "condition is false which is exactly what we want in this lesson"
+).split()
+TOKENS_CODIGO = (
+    "i32",
+    "u64",
+    "f64",
+    "String",
+    "Vec<T>",
+    "HashMap",
+    "Option<i32>",
+    "bool",
+    "usize",
+    "&str",
+    "Result<T, E>",
+    "println!",
+)
+
+
+def genera_texto(azar: random.Random, largo: int, densidad_codigo: float) -> str:
+    palabras: list[str] = []
+    while sum(len(p) + 1 for p in palabras) < largo:
+        if azar.random() < densidad_codigo:
+            palabras.append(azar.choice(TOKENS_CODIGO))
+        else:
+            palabras.append(azar.choice(PALABRAS))
+    texto = " ".join(palabras)
+    # sólo la primera letra: capitalize() pasaría a minúsculas los tokens de
+    # código (Vec<T> → vec<t>) y la protección se mediría con otro texto
+    texto = texto[:1].upper() + texto[1:] + "."
+    # cues largos en dos líneas, como en los subtítulos reales
+    if len(texto) > 42 and " " in texto[len(texto) // 2 :]:
+        corte = texto.index(" ", len(texto) // 2)
+        texto = texto[:corte] + "\n" + texto[corte + 1 :]
+    return texto
+
+
+def tiempo(ms: int, formato: str) -> str:
+    h, resto = divmod(ms, 3_600_000)
+    m, resto = divmod(resto, 60_000)
+    s, ms = divmod(resto, 1000)
+    sep = "," if formato == "srt" else "."
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+
+def genera_corpus(destino: Path, params: argparse.Namespace) -> dict:
+    """Escribe el corpus en `destino` y devuelve sus totales."""
+    azar = random.Random(params.semilla)
+    vistos: list[str] = []
+    cues = chars = 0
+    for n in range(params.archivos):
+        formato = params.formato
+        if formato == "mixto":
+            formato = "vtt" if n % 2 == 0 else "srt"
+        carpeta = destino / f"modulo{n // params.por_carpeta:03d}"
+        carpeta.mkdir(parents=True, exist_ok=True)
+        bloques = ["WEBVTT"] if formato == "vtt" else []
+        for i in range(params.cues):
+            if vistos and azar.random() < params.repeticion:
+                texto = azar.choice(vistos)
+            else:
+                largo = max(5, int(azar.gauss(params.largo_cue, params.largo_cue / 4)))
+                texto = genera_texto(azar, largo, params.densidad_codigo)
+                vistos.append(texto)
+            inicio = i * 3000
+            tiempos = f"{tiempo(inicio, formato)} --> {tiempo(inicio + 2500, formato)}"
+            bloques.append(f"{i + 1}\n{tiempos}\n{texto}")
+            cues += 1
+            chars += len(texto)
+        (carpeta / f"leccion{n:04d}.{formato}").write_text(
+            "\n\n".join(bloques) + "\n", encoding="utf-8"
+        )
+    return {"archivos": params.archivos, "cues": cues, "chars": chars}
+
+
+def version() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=AQUI,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocida"
+
+
+def ejecuta(corpus: Path, trabajo: Path, params: argparse.Namespace) -> dict:
+    """Traduce una copia limpia del corpus y devuelve sus medidas."""
+    raiz = trabajo / "corpus"
+    shutil.rmtree(raiz, ignore_errors=True)
+    shutil.copytree(corpus, raiz)
+    resumen = trabajo / "metricas.json"
+    orden = [
+        sys.executable,
+        str(AQUI / "traduce.py"),
+        "--root",
+        str(raiz),
+        "--backend",
+        "mock",
+        "--mock-latency",
+        str(params.latencia),
+        "--rps",
+        str(params.rps),
+        "--burst",
+        str(params.rafaga),
+        "--workers",
+        str(params.workers),
+        "--procs",
+        str(params.procs),
+        "--batch-chars",
+        str(params.batch_chars),
+        "--in-flight",
+        str(params.in_flight),
+        "--metrics",
+        str(resumen),
+    ]
+    if params.cache:
+        orden += ["--cache-dir", str(trabajo / "cache")]
+    else:
+        orden.append("--no-cache")
+    if params.use_dict:
+        orden.append("--use-dict")
+
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        orden, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    wall = time.perf_counter() - inicio
+    if proceso.returncode:
+        raise SystemExit(f"traduce.py terminó con error:\n{proceso.stderr}")
+    metricas = json.loads(resumen.read_text(encoding="utf-8"))
+    return {"wall_s": wall, "metricas": metricas}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--archivos", type=int, default=50)
+    parser.add_argument("--cues", type=int, default=200, help="Cues por archivo")
+    parser.add_argument(
+        "--largo-cue", type=int, default=60, help="Caracteres medios por cue"
+    )
+    parser.add_argument(
+        "--repeticion",
+        type=float,
+        default=0.2,
+        help="Probabilidad de que un cue repita el texto de otro (0-1)",
+    )
+    parser.add_argument(
+        "--densidad-codigo",
+        type=float,
+        default=0.1,
+        help="Proporción de palabras que son tokens de código (0-1)",
+    )
+    parser.add_argument("--formato", choices=("vtt", "srt", "mixto"), default="mixto")
+    parser.add_argument("--por-carpeta", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument(
+        "--latencia", type=float, default=0.0, help="Latencia del backend mock (s)"
+    )
+    parser.add_argument("--rps", type=float, default=1_000_000)
+    parser.add_argument("--rafaga", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--procs", type=int, default=0, help="Procesos de lectura/protección"
+    )
+    parser.add_argument("--batch-chars", type=int, default=4500)
+    parser.add_argument("--in-flight", type=int, default=4)
+    parser.add_argument("--use-dict", action="store_true")
+    parser.add_argument(
+        "--cache", action="store_true", help="Usar la memoria de traducción"
+    )
+    parser.add_argument(
+        "--repeticiones",
+        type=int,
+        default=3,
+        help="Veces que se traduce el corpus; se informa la más rápida",
+    )
+    parser.add_argument("--salida", type=Path, default=AQUI / "bench_output.txt")
+    params = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-traduce-") as tmp:
+        trabajo = Path(tmp)
+        corpus = trabajo / "plantilla"
+        inicio = time.perf_counter()
+        totales = genera_corpus(corpus, params)
+        print(
+            f"Corpus: {totales['archivos']} archivos, {totales['cues']} cues, "
+            f"{totales['chars']} caracteres ({time.perf_counter() - inicio:.1f} s)"
+        )
+        ejecuciones = []
+        for n in range(params.repeticiones):
+            ejecuciones.append(ejecuta(corpus, trabajo, params))
+            shutil.rmtree(trabajo / "cache", ignore_errors=True)
+            print(f"  ejecución {n + 1}: {ejecuciones[-1]['wall_s']:.3f} s")
+
+    mejor = min(ejecuciones, key=lambda e: e["wall_s"])
+    wall = mejor["wall_s"]
+    metricas = mejor["metricas"]
+    pico_kb = (
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss if resource else None
+    )
+    resultado = {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "version": version(),
+        "python": platform.python_version(),
+        "parametros": {
+            k: str(v) if isinstance(v, Path) else v for k, v in vars(params).items()
+        },
+        "corpus": totales,
+        "wall_s": round(wall, 4),
+        "todas_s": [round(e["wall_s"], 4) for e in ejecuciones],
+        "archivos_s": round(totales["archivos"] / wall, 2),
+        "cues_s": round(totales["cues"] / wall, 1),
+        "chars_s": round(totales["chars"] / wall, 1),
+        "pico_mem_kb": pico_kb,
+        "fases_s": metricas["fases_s"],
+        "peticiones": metricas["peticiones"],
+        "cache": metricas["cache"],
+    }
+    with params.salida.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+    print(
+        f"\nMejor: {wall:.3f} s · {resultado['archivos_s']} archivos/s · "
+        f"{resultado['cues_s']} cues/s · {resultado['chars_s']} caracteres/s"
+    )
+    print(
+        "Etapas (s): " + ", ".join(f"{k} {v}" for k, v in metricas["fases_s"].items())
+    )
+    if pico_kb is not None:
+        print(f"Pico de memoria: {pico_kb / 1024:.1f} MB")
+    print(f"Resultado añadido a {params.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -261,7 +261,8 @@ CYBER = {
     "capec",
 }
 
-PALABRAS = {
+# python y django
+PYTHON = {
     "self",
     "cls",
     "init",
@@ -335,6 +336,186 @@ PALABRAS = {
     "precommit",
     "tox",
     "nox",
+    "django",
+    "djangorestframework",
+    "drf",
+    "models",
+    "views",
+    "templates",
+    "urls",
+    "admin",
+    "managepy",
+    "migrations",
+    "orm",
+    "queryset",
+    "manager",
+    "serializer",
+    "viewset",
+    "router",
+    "middleware",
+    "decorators",
+    "signals",
+    "celery",
+    "redis",
+    "channels",
+    "asgi",
+    "wsgi",
+    "gunicorn",
+    "uwsgi",
+    "pytestdjango",
+    "factoryboy",
+    "faker",
+    "djangoq",
+    "silk",
+    "debugtoolbar",
+    "allauth",
+    "crispyforms",
+    "ckeditor",
+    "storages",
+    "constance",
+    "guardian",
+}
+
+# trading y metatrader
+TRADING = {
+    "pip",
+    "spread",
+    "lot",
+    "leverage",
+    "margin",
+    "equity",
+    "balance",
+    "bid",
+    "ask",
+    "long",
+    "short",
+    "bullish",
+    "bearish",
+    "swap",
+    "rollover",
+    "slippage",
+    "commission",
+    "takeprofit",
+    "stoploss",
+    "tp",
+    "sl",
+    "pending",
+    "marketorder",
+    "limitorder",
+    "stoporder",
+    "trailingstop",
+    "hedge",
+    "scalping",
+    "swing",
+    "daytrade",
+    "position",
+    "candlestick",
+    "doji",
+    "hammer",
+    "shootingstar",
+    "engulfing",
+    "macd",
+    "rsi",
+    "bollinger",
+    "fibonacci",
+    "support",
+    "resistance",
+    "trendline",
+    "breakout",
+    "pullback",
+    "retracement",
+    "correction",
+    "drawdown",
+    "backtest",
+    "forwardtest",
+    "expertadvisor",
+    "ea",
+    "metatrader",
+    "ctrader",
+    "tradingview",
+    "pinescript",
+    "mql4",
+    "mql5",
+    "calgo",
+    "cbots",
+    "indicator",
+    "oscillator",
+    "volume",
+    "volatility",
+    "liquidity",
+    "spread",
+    "swap",
+    "margin call",
+    "free margin",
+}
+
+# git, forjas y ci
+GIT = {
+    "git",
+    "github",
+    "gitlab",
+    "bitbucket",
+    "gitea",
+    "gitee",
+    "commit",
+    "push",
+    "pull",
+    "fetch",
+    "merge",
+    "rebase",
+    "cherrypick",
+    "stash",
+    "branch",
+    "main",
+    "master",
+    "develop",
+    "feature",
+    "hotfix",
+    "release",
+    "tag",
+    "clone",
+    "fork",
+    "pr",
+    "pullrequest",
+    "issue",
+    "wiki",
+    "actions",
+    "workflow",
+    "ci",
+    "cd",
+    "pipeline",
+    "artifact",
+    "runner",
+    "container",
+    "docker",
+    "yaml",
+    "yml",
+    "json",
+    "markdown",
+    "readme",
+    "license",
+    "gitignore",
+    "gitattributes",
+    "submodule",
+    "subtree",
+    "blame",
+    "diff",
+    "log",
+    "reflog",
+    "reset",
+    "revert",
+    "rm",
+    "mv",
+    "bisect",
+    "hook",
+    "precommit",
+    "postcommit",
+    "prepush",
+    "pre-receive",
+    "post-receive",
+}
+
+PALABRAS = {
     "promise",
     "async",
     "await",
@@ -633,44 +814,6 @@ PALABRAS = {
     "axios",
     "swr",
     "tanstackquery",
-    "django",
-    "djangorestframework",
-    "drf",
-    "models",
-    "views",
-    "templates",
-    "urls",
-    "admin",
-    "managepy",
-    "migrations",
-    "orm",
-    "queryset",
-    "manager",
-    "serializer",
-    "viewset",
-    "router",
-    "middleware",
-    "decorators",
-    "signals",
-    "celery",
-    "redis",
-    "channels",
-    "asgi",
-    "wsgi",
-    "gunicorn",
-    "uwsgi",
-    "pytestdjango",
-    "factoryboy",
-    "faker",
-    "djangoq",
-    "silk",
-    "debugtoolbar",
-    "allauth",
-    "crispyforms",
-    "ckeditor",
-    "storages",
-    "constance",
-    "guardian",
     "postgresql",
     "mysql",
     "mariadb",
@@ -954,136 +1097,68 @@ PALABRAS = {
     "codeium",
     "cursor",
     "continue",
-    "pip",
-    "spread",
-    "lot",
-    "leverage",
-    "margin",
-    "equity",
-    "balance",
-    "bid",
-    "ask",
-    "long",
-    "short",
-    "bullish",
-    "bearish",
-    "swap",
-    "rollover",
-    "slippage",
-    "commission",
-    "takeprofit",
-    "stoploss",
-    "tp",
-    "sl",
-    "pending",
-    "marketorder",
-    "limitorder",
-    "stoporder",
-    "trailingstop",
-    "hedge",
-    "scalping",
-    "swing",
-    "daytrade",
-    "position",
-    "candlestick",
-    "doji",
-    "hammer",
-    "shootingstar",
-    "engulfing",
-    "macd",
-    "rsi",
-    "bollinger",
-    "fibonacci",
-    "support",
-    "resistance",
-    "trendline",
-    "breakout",
-    "pullback",
-    "retracement",
-    "correction",
-    "drawdown",
-    "backtest",
-    "forwardtest",
-    "expertadvisor",
-    "ea",
-    "metatrader",
-    "ctrader",
-    "tradingview",
-    "pinescript",
-    "mql4",
-    "mql5",
-    "calgo",
-    "cbots",
-    "indicator",
-    "oscillator",
-    "volume",
-    "volatility",
-    "liquidity",
-    "spread",
-    "swap",
-    "margin call",
-    "free margin",
-    "git",
-    "github",
-    "gitlab",
-    "bitbucket",
-    "gitea",
-    "gitee",
-    "commit",
-    "push",
-    "pull",
-    "fetch",
-    "merge",
-    "rebase",
-    "cherrypick",
-    "stash",
-    "branch",
-    "main",
-    "master",
-    "develop",
-    "feature",
-    "hotfix",
-    "release",
-    "tag",
-    "clone",
-    "fork",
-    "pr",
-    "pullrequest",
-    "issue",
-    "wiki",
-    "actions",
-    "workflow",
-    "ci",
-    "cd",
-    "pipeline",
-    "artifact",
-    "runner",
-    "container",
-    "docker",
-    "yaml",
-    "yml",
-    "json",
-    "markdown",
-    "readme",
-    "license",
-    "gitignore",
-    "gitattributes",
-    "submodule",
-    "subtree",
-    "blame",
-    "diff",
-    "log",
-    "reflog",
-    "reset",
-    "revert",
-    "rm",
-    "mv",
-    "bisect",
-    "hook",
-    "precommit",
-    "postcommit",
-    "prepush",
-    "pre-receive",
-    "post-receive",
+    *PYTHON,
+    *TRADING,
+    *GIT,
     *CYBER,
 }
+
+# ------------- glosarios (--domains) -------------
+# término en inglés → {idioma: traducción fija}. Un término del glosario se
+# protege igual que una palabra del diccionario (viaja como ⟦N⟧) y al volver
+# se sustituye por su traducción en el idioma de destino; si no la tiene para
+# ese idioma, se deja en inglés.
+
+GLOSARIO_CYBER = {
+    "attack surface": {"es": "superficie de ataque", "pt": "superfície de ataque"},
+    "threat actor": {"es": "actor de amenazas", "pt": "agente de ameaças"},
+    "privilege escalation": {
+        "es": "escalada de privilegios",
+        "pt": "escalonamento de privilégios",
+    },
+    "lateral movement": {"es": "movimiento lateral", "pt": "movimento lateral"},
+    "penetration testing": {"es": "pruebas de penetración", "pt": "teste de invasão"},
+    "vulnerability": {"es": "vulnerabilidad", "pt": "vulnerabilidade"},
+    "vulnerabilities": {"es": "vulnerabilidades", "pt": "vulnerabilidades"},
+}
+
+GLOSARIO_PYTHON = {
+    "scaffold": {"es": "andamiaje", "pt": "estrutura inicial"},
+    "scaffolding": {"es": "andamiaje", "pt": "estrutura inicial"},
+    "list comprehension": {"es": "comprensión de listas", "pt": "list comprehension"},
+    "virtual environment": {"es": "entorno virtual", "pt": "ambiente virtual"},
+    "type hint": {"es": "anotación de tipo", "pt": "anotação de tipo"},
+    "type hints": {"es": "anotaciones de tipo", "pt": "anotações de tipo"},
+    "keyword argument": {"es": "argumento con nombre", "pt": "argumento nomeado"},
+    "built-in": {"es": "integrada", "pt": "embutida"},
+}
+
+GLOSARIO_TRADING = {
+    "pullback": {"es": "retroceso", "pt": "pullback"},
+    "retracement": {"es": "retroceso", "pt": "retração"},
+    "breakout": {"es": "ruptura", "pt": "rompimento"},
+    "support": {"es": "soporte", "pt": "suporte"},
+    "resistance": {"es": "resistencia", "pt": "resistência"},
+    "trendline": {"es": "línea de tendencia", "pt": "linha de tendência"},
+    "uptrend": {"es": "tendencia alcista", "pt": "tendência de alta"},
+    "downtrend": {"es": "tendencia bajista", "pt": "tendência de baixa"},
+    "candlestick": {"es": "vela japonesa", "pt": "candlestick"},
+}
+
+GLOSARIO_GIT = {
+    "repository": {"es": "repositorio", "pt": "repositório"},
+    "merge conflict": {"es": "conflicto de merge", "pt": "conflito de merge"},
+    "staging area": {"es": "área de preparación", "pt": "área de staging"},
+    "working tree": {"es": "árbol de trabajo", "pt": "árvore de trabalho"},
+    "commit message": {"es": "mensaje de commit", "pt": "mensagem de commit"},
+    "pull request": {"es": "pull request", "pt": "pull request"},
+}
+
+# nombre para --domains → (palabras que no se traducen, glosario). Si una
+# palabra está en los dos, manda el glosario
+DOMINIOS = {
+    "cyber": (CYBER, GLOSARIO_CYBER),
+    "python": (PYTHON, GLOSARIO_PYTHON),
+    "trading": (TRADING, GLOSARIO_TRADING),
+    "git": (GIT, GLOSARIO_GIT),
+}
@@ -0,0 +1,175 @@
+"""
+Empaquetado de textos en peticiones que aprovechen el tope de caracteres.
+
+- `parte_texto` divide un cue que no cabe en una petición por el final de
+  frase más cercano al tope (si no hay, por un espacio; en último caso, corta
+  sin partir una marca ⟦N⟧). `une` lo rearma con los separadores originales.
+- `Empaquetador` junta los textos pendientes de todos los workers en
+  peticiones llenas: con muchos archivos pequeños en paralelo, cada uno por
+  separado sólo llenaría una fracción de la petición. Espera como mucho
+  `espera` segundos a que se llene el paquete, y no espera nada si todos los
+  workers ya están bloqueados esperando traducciones.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from functools import partial
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# fin de frase seguido de espacio, o salto de línea
+RE_FRASE = re.compile(r"(?<=[.!?…;:])\s+|\n+")
+RE_ESPACIO = re.compile(r"\s+")
+
+
+def _corte(texto: str, tope: int) -> tuple[int, int]:
+    """(fin del trozo, inicio del siguiente) para un trozo de ≤ `tope`."""
+    for patron in (RE_FRASE, RE_ESPACIO):
+        ultimo = None
+        for m in patron.finditer(texto, 1, tope + 1):
+            if m.start() <= tope:
+                ultimo = m
+        if ultimo is not None:
+            return ultimo.start(), ultimo.end()
+    corte = tope
+    abre = texto.rfind("⟦", 0, corte)
+    if abre > texto.rfind("⟧", 0, corte) and abre > 0:
+        corte = abre
+    return corte, corte
+
+
+def parte_texto(texto: str, tope: int) -> tuple[list[str], list[str]]:
+    """Trozos de ≤ `tope` caracteres y los separadores que había entre ellos."""
+    trozos: list[str] = []
+    separadores: list[str] = []
+    if tope > 0:
+        while len(texto) > tope:
+            fin, siguiente = _corte(texto, tope)
+            trozos.append(texto[:fin])
+            separadores.append(texto[fin:siguiente])
+            texto = texto[siguiente:]
+    trozos.append(texto)
+    return trozos, separadores
+
+
+def une(trozos: list[str], separadores: list[str]) -> str:
+    partes = [trozos[0]]
+    for sep, trozo in zip(separadores, trozos[1:]):
+        partes += [sep or "", trozo]
+    return "".join(partes)
+
+
+def _avisa(avisa: Callable[[int, str], None], i: int, futuro: Future) -> None:
+    if not futuro.cancelled() and futuro.exception() is None:
+        if (traduccion := futuro.result()) is not None:
+            avisa(i, traduccion)
+
+
+class Empaquetador:
+    """`traduce(textos)` es bloqueante y se puede llamar desde varios hilos;
+    `envia(textos)` recibe paquetes de hasta `max_chars` caracteres (mezcla
+    de varios llamadores) y devuelve sus traducciones (None = fallida).
+    `avisa(i, traduccion)`, si se da, se llama (desde el hilo que envió el
+    paquete) por cada texto traducido en cuanto vuelve su paquete."""
+
+    def __init__(
+        self,
+        envia: Callable[[list[str]], list[str | None]],
+        max_chars: int,
+        productores: int,
+        espera: float = 0.05,
+        hilos: int = 1,
+    ) -> None:
+        self.envia = envia
+        self.max_chars = max_chars
+        self.productores = productores
+        self.espera = espera
+        self.paquetes = 0  # paquetes enviados (para pruebas/diagnóstico)
+        self._cola: deque[tuple[str, Future]] = deque()
+        self._chars = 0
+        self._esperando = 0
+        self._cerrado = False
+        self._cond = threading.Condition()
+        # importado aquí: parte_texto/une no lo necesitan
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._pool = ThreadPoolExecutor(max_workers=hilos)
+        self._hilo = threading.Thread(
+            target=self._bucle, name="empaquetador", daemon=True
+        )
+        self._hilo.start()
+
+    def traduce(
+        self,
+        textos: list[str],
+        avisa: Callable[[int, str], None] | None = None,
+    ) -> list[str | None]:
+        from concurrent.futures import Future
+
+        futuros = [Future() for _ in textos]
+        if avisa is not None:
+            for i, futuro in enumerate(futuros):
+                futuro.add_done_callback(partial(_avisa, avisa, i))
+        with self._cond:
+            self._cola.extend(zip(textos, futuros))
+            self._chars += sum(map(len, textos))
+            self._esperando += 1
+            self._cond.notify()
+        try:
+            return [f.result() for f in futuros]
+        finally:
+            with self._cond:
+                self._esperando -= 1
+
+    def cierra(self) -> None:
+        """Envía lo que quede en la cola y termina el hilo y sus envíos."""
+        with self._cond:
+            self._cerrado = True
+            self._cond.notify()
+        self._hilo.join()
+        self._pool.shutdown()
+
+    def _bucle(self) -> None:
+        while True:
+            with self._cond:
+                while not self._cola:
+                    if self._cerrado:
+                        return
+                    self._cond.wait()
+                # esperar a llenar el paquete, salvo que nadie más pueda
+                # aportar textos (todos los workers esperando)
+                limite = time.monotonic() + self.espera
+                while (
+                    self._chars < self.max_chars
+                    and self._esperando < self.productores
+                    and not self._cerrado
+                    and (resto := limite - time.monotonic()) > 0
+                ):
+                    self._cond.wait(resto)
+                paquete: list[tuple[str, Future]] = []
+                chars = 0
+                while self._cola and (
+                    not paquete or chars + len(self._cola[0][0]) <= self.max_chars
+                ):
+                    texto, futuro = self._cola.popleft()
+                    paquete.append((texto, futuro))
+                    chars += len(texto)
+                self._chars -= chars
+                self.paquetes += 1
+            self._pool.submit(self._despacha, paquete)
+
+    def _despacha(self, paquete: list[tuple[str, Future]]) -> None:
+        try:
+            resultados = self.envia([texto for texto, _ in paquete])
+        except BaseException as exc:
+            for _, futuro in paquete:
+                futuro.set_exception(exc)
+            return
+        for (_, futuro), resultado in zip(paquete, resultados):
+            futuro.set_result(resultado)
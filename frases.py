@@ -0,0 +1,100 @@
+"""
+Unión de cues en frases completas y reparto de la traducción entre ellos.
+
+Los subtítulos suelen partir una frase en varios cues seguidos ("Let's name it
+Brown and it will" / "contain colors."). Traducidos por separado, cada trozo
+es una petición y el traductor no ve la frase entera.
+
+- `agrupa_frases` junta cues consecutivos hasta el que termina la frase (con
+  límites de cues, caracteres y pausa entre ellos).
+- `reparte` divide la traducción de la frase entre sus cues, en proporción al
+  largo del texto original de cada uno y sin partir palabras (una marca ⟦N⟧
+  cuenta como palabra). Los tiempos de los cues no se tocan.
+- `equilibra_lineas` vuelve a partir el texto de un cue en tantas líneas como
+  tenía el original, de largo parecido.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Sequence
+
+from subtitulos import Cue
+
+# fin de frase: . ! ? … seguidos, quizá, de comillas o paréntesis de cierre
+RE_FIN = re.compile(r"[.!?…][\"'”’»)\]]*$")
+MAX_CUES = 4  # cues por frase como mucho
+MAX_PAUSA_MS = 2000  # una pausa más larga separa frases aunque falte el punto
+
+
+def termina_frase(texto: str) -> bool:
+    return bool(RE_FIN.search(texto.rstrip()))
+
+
+def agrupa_frases(
+    cues: Sequence[Cue],
+    max_chars: int,
+    max_cues: int = MAX_CUES,
+    max_pausa_ms: int = MAX_PAUSA_MS,
+) -> list[list[int]]:
+    """Índices de `cues` agrupados por frase (grupos de un solo cue si ya
+    termina en punto o no se puede unir con el siguiente)."""
+    grupos: list[list[int]] = []
+    actual: list[int] = []
+    largo = 0
+    for i, cue in enumerate(cues):
+        texto = cue.texto
+        if actual and (
+            len(actual) >= max_cues
+            or largo + 1 + len(texto) > max_chars
+            or cue.inicio - cues[actual[-1]].fin > max_pausa_ms
+        ):
+            grupos.append(actual)
+            actual, largo = [], 0
+        actual.append(i)
+        largo += len(texto) + (1 if largo else 0)
+        if termina_frase(texto):
+            grupos.append(actual)
+            actual, largo = [], 0
+    if actual:
+        grupos.append(actual)
+    return grupos
+
+
+def reparte(texto: str, pesos: Sequence[int]) -> list[str] | None:
+    """Divide `texto` en len(pesos) trozos por palabras, cada uno de largo
+    proporcional a su peso. None si no hay al menos una palabra por trozo."""
+    palabras = texto.split()
+    n = len(pesos)
+    if len(palabras) < n:
+        return None
+    total_pesos = sum(pesos) or n
+    total = sum(map(len, palabras)) + len(palabras) - 1
+    trozos: list[str] = []
+    inicio = 0
+    acumulado = 0.0  # largo objetivo acumulado
+    hecho = 0  # largo ya asignado
+    for k in range(n - 1):
+        acumulado += total * (pesos[k] or 1) / total_pesos
+        fin = inicio + 1  # al menos una palabra
+        largo = hecho + len(palabras[inicio])
+        # avanzar mientras acerque al objetivo y deje una palabra por trozo
+        while fin < len(palabras) - (n - 1 - k) and abs(
+            largo + 1 + len(palabras[fin]) - acumulado
+        ) < abs(largo - acumulado):
+            largo += 1 + len(palabras[fin])
+            fin += 1
+        trozos.append(" ".join(palabras[inicio:fin]))
+        hecho = largo + 1
+        inicio = fin
+    trozos.append(" ".join(palabras[inicio:]))
+    return trozos
+
+
+def equilibra_lineas(texto: str, n: int) -> str:
+    """`texto` en `n` líneas (o menos, si no hay palabras) de largo parecido."""
+    palabras = texto.split()
+    if n <= 1 or len(palabras) < 2:
+        return texto
+    lineas = reparte(" ".join(palabras), [1] * min(n, len(palabras)))
+    return "\n".join(lineas or [texto])
@@ -0,0 +1,75 @@
+"""
+Limitador de peticiones compartido (token bucket) para todas las llamadas al
+traductor del proceso.
+
+- `tasa` fichas por segundo, hasta `rafaga` acumuladas.
+- Si el traductor falla, la tasa efectiva se reduce a la mitad (hasta
+  `tasa_min`); cada petición correcta la recupera poco a poco hasta `tasa`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class LimitadorTasa:
+    def __init__(
+        self,
+        tasa: float,
+        rafaga: int = 1,
+        tasa_min: float | None = None,
+        recuperacion: float = 0.1,
+    ) -> None:
+        if tasa <= 0:
+            raise ValueError("la tasa debe ser positiva")
+        self.tasa_max = float(tasa)
+        self.tasa_min = tasa_min if tasa_min is not None else self.tasa_max / 16
+        self.rafaga = max(1, int(rafaga))
+        self.recuperacion = recuperacion
+        self._tasa = self.tasa_max
+        self._fichas = float(self.rafaga)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def tasa(self) -> float:
+        """Tasa efectiva actual (peticiones/s), ya aplicado el backoff."""
+        return self._tasa
+
+    def _reserva(self) -> float:
+        """Consume una ficha si hay; si no, devuelve los segundos a esperar."""
+        with self._lock:
+            ahora = time.monotonic()
+            self._fichas = min(
+                self.rafaga, self._fichas + (ahora - self._ultimo) * self._tasa
+            )
+            self._ultimo = ahora
+            if self._fichas >= 1:
+                self._fichas -= 1
+                return 0.0
+            return (1 - self._fichas) / self._tasa
+
+    def adquiere(self) -> None:
+        """Bloquea el hilo hasta que haya una ficha disponible."""
+        while (espera := self._reserva()) > 0:
+            time.sleep(espera)
+
+    async def adquiere_async(self) -> None:
+        """Como `adquiere`, pero cediendo el event loop mientras espera."""
+        import asyncio  # sólo lo usa el backend google-async
+
+        while (espera := self._reserva()) > 0:
+            await asyncio.sleep(espera)
+
+    def exito(self) -> None:
+        with self._lock:
+            self._tasa = min(
+                self.tasa_max, self._tasa + self.tasa_max * self.recuperacion
+            )
+
+    def fallo(self) -> None:
+        with self._lock:
+            self._tasa = max(self.tasa_min, self._tasa / 2)
+            # vaciar el cubo: tras un error no se permite ráfaga
+            self._fichas = min(self._fichas, 0.0)
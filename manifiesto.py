@@ -0,0 +1,242 @@
+"""
+Manifiesto de traducciones por carpeta de salida (esp/.manifiesto.json).
+
+Por cada archivo fuente guarda tamaño, mtime y hash del original, con qué
+motor y modo de protección se tradujo, y tamaño y hash de la salida. Así,
+decidir si un archivo ya está traducido cuesta un `stat` y una búsqueda en un
+diccionario. El hash sólo se recalcula si el `stat` del original cambió.
+
+Además, cada archivo traducido deja su registro cue a cue
+(esp/.cues/<original>.jsonl: texto original → traducción) para que
+--incremental sólo retraduzca los cues que cambiaron. Mientras el archivo se
+traduce, ese registro se va volcando a disco (esp/.cues/<original>.jsonl.parcial)
+cada CHECKPOINT_CUES cues o CHECKPOINT_SEG segundos: si la ejecución se corta,
+--resume reutiliza esos cues en lugar de volver a pedirlos (y los conserva en
+el nuevo parcial, por si también se corta).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TextIO
+
+NOMBRE_MANIFIESTO = ".manifiesto.json"
+CARPETA_CUES = ".cues"
+GUARDA_CADA = 2.0  # segundos mínimos entre escrituras del manifiesto
+CHECKPOINT_CUES = 50  # cues anotados entre volcados del registro parcial
+CHECKPOINT_SEG = 5.0  # ... o segundos, lo que llegue antes
+
+AL_DIA = "al_dia"
+CAMBIADO = "cambiado"
+NUEVO = "nuevo"
+
+
+def hash_archivo(ruta: Path) -> str:
+    h = hashlib.sha1()
+    with ruta.open("rb") as f:
+        for trozo in iter(lambda: f.read(1 << 20), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+class Manifiesto:
+    def __init__(self, carpeta: Path) -> None:
+        self.ruta = carpeta / NOMBRE_MANIFIESTO
+        self._lock = threading.Lock()
+        self._sucio = False
+        self._ultimo_guardado = 0.0
+        try:
+            self.entradas: dict[str, dict] = json.loads(
+                self.ruta.read_text(encoding="utf-8")
+            )
+        except (FileNotFoundError, ValueError):
+            self.entradas = {}
+
+    def estado(self, origen: Path, salida: Path, firma: dict) -> str:
+        """AL_DIA, CAMBIADO (origen, salida o firma distintos) o NUEVO."""
+        with self._lock:
+            entrada = self.entradas.get(origen.name)
+        if entrada is None:
+            return NUEVO
+        if any(entrada.get(k) != v for k, v in firma.items()):
+            return CAMBIADO
+        try:
+            st_salida = salida.stat()
+        except FileNotFoundError:
+            return CAMBIADO
+        if st_salida.st_size != entrada["tam_salida"]:
+            return CAMBIADO
+
+        st = origen.stat()
+        if (st.st_size, st.st_mtime_ns) == (entrada["tam"], entrada["mtime_ns"]):
+            return AL_DIA
+        # el stat cambió (copiado, touch...): decide el contenido
+        if st.st_size != entrada["tam"] or hash_archivo(origen) != entrada["sha1"]:
+            return CAMBIADO
+        with self._lock:
+            entrada["mtime_ns"] = st.st_mtime_ns
+            self._sucio = True
+        return AL_DIA
+
+    def registra(self, origen: Path, salida: Path, firma: dict) -> None:
+        st = origen.stat()
+        entrada = {
+            "tam": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha1": hash_archivo(origen),
+            "salida": salida.name,
+            "tam_salida": salida.stat().st_size,
+            "sha1_salida": hash_archivo(salida),
+            **firma,
+        }
+        with self._lock:
+            self.entradas[origen.name] = entrada
+            self._sucio = True
+        if time.monotonic() - self._ultimo_guardado >= GUARDA_CADA:
+            self.guarda()
+
+    def guarda(self) -> None:
+        with self._lock:
+            if not self._sucio:
+                return
+            tmp = self.ruta.with_name(self.ruta.name + ".tmp")
+            tmp.write_text(
+                json.dumps(self.entradas, ensure_ascii=False, indent=1),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.ruta)
+            self._sucio = False
+            self._ultimo_guardado = time.monotonic()
+
+
+_manifiestos: dict[Path, Manifiesto] = {}
+_lock_manifiestos = threading.Lock()
+
+
+def manifiesto_de(carpeta: Path) -> Manifiesto:
+    """Manifiesto compartido de una carpeta de salida (uno por proceso)."""
+    with _lock_manifiestos:
+        if carpeta not in _manifiestos:
+            _manifiestos[carpeta] = Manifiesto(carpeta)
+        return _manifiestos[carpeta]
+
+
+def guarda_manifiestos() -> None:
+    with _lock_manifiestos:
+        pendientes = list(_manifiestos.values())
+    for manifiesto in pendientes:
+        manifiesto.guarda()
+
+
+def ruta_registro(carpeta: Path, origen: Path) -> Path:
+    return carpeta / CARPETA_CUES / (origen.name + ".jsonl")
+
+
+def ruta_parcial(carpeta: Path, origen: Path) -> Path:
+    ruta = ruta_registro(carpeta, origen)
+    return ruta.with_name(ruta.name + ".parcial")
+
+
+def _lee_pares(ruta: Path, firma: dict) -> dict[str, str]:
+    try:
+        with ruta.open(encoding="utf-8") as f:
+            if json.loads(next(f, "null")) != {"firma": firma}:
+                return {}
+            pares: dict[str, str] = {}
+            for linea in f:
+                try:
+                    texto, trad = json.loads(linea)
+                except ValueError:
+                    break  # última línea a medio escribir cuando se cortó
+                pares[texto] = trad
+            return pares
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def lee_registro(carpeta: Path, origen: Path, firma: dict) -> dict[str, str]:
+    """Traducciones cue a cue de la ejecución anterior; {} si no hay o si se
+    hicieron con otra firma (motor/modo)."""
+    return _lee_pares(ruta_registro(carpeta, origen), firma)
+
+
+def lee_parcial(carpeta: Path, origen: Path, firma: dict) -> dict[str, str]:
+    """Cues ya traducidos de un archivo que se quedó a medias (--resume)."""
+    return _lee_pares(ruta_parcial(carpeta, origen), firma)
+
+
+class EscritorRegistro:
+    """`with EscritorRegistro(carpeta, origen, firma) as reg: reg.anota(...)`.
+
+    Escribe en el registro parcial y lo vuelca a disco cada `cada_cues` cues o
+    `cada_seg` segundos. El registro anterior sólo se reemplaza si el archivo
+    terminó bien; si no, el parcial se conserva para --resume. Con `conserva`,
+    el parcial nuevo empieza con lo que ya tenía el anterior. `anota` se puede
+    llamar desde varios hilos.
+    """
+
+    def __init__(
+        self,
+        carpeta: Path,
+        origen: Path,
+        firma: dict,
+        cada_cues: int = CHECKPOINT_CUES,
+        cada_seg: float = CHECKPOINT_SEG,
+        conserva: bool = False,
+    ) -> None:
+        self.ruta = ruta_registro(carpeta, origen)
+        self.ruta.parent.mkdir(exist_ok=True)
+        self.parcial = ruta_parcial(carpeta, origen)
+        self.firma = firma
+        self.cada_cues = cada_cues
+        self.cada_seg = cada_seg
+        self.conserva = conserva
+        self._copiados: dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._pendientes = 0
+        self._ultimo = time.monotonic()
+        self._f: TextIO | None = None
+
+    def __enter__(self) -> EscritorRegistro:
+        if self.conserva:
+            self._copiados = _lee_pares(self.parcial, self.firma)
+        self._f = self.parcial.open("w", encoding="utf-8")
+        self._f.write(json.dumps({"firma": self.firma}) + "\n")
+        for texto, traduccion in self._copiados.items():
+            self._f.write(json.dumps([texto, traduccion], ensure_ascii=False) + "\n")
+        if self._copiados:
+            self.checkpoint()
+        return self
+
+    def __exit__(self, tipo, exc, tb) -> None:
+        assert self._f is not None
+        self._f.close()
+        if tipo is None:
+            os.replace(self.parcial, self.ruta)
+
+    def anota(self, texto: str, traduccion: str) -> None:
+        assert self._f is not None
+        if self._copiados.get(texto) == traduccion:
+            return  # ya está en el parcial
+        with self._lock:
+            self._f.write(json.dumps([texto, traduccion], ensure_ascii=False) + "\n")
+            self._pendientes += 1
+            if (
+                self._pendientes >= self.cada_cues
+                or time.monotonic() - self._ultimo >= self.cada_seg
+            ):
+                self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Vuelca a disco lo anotado hasta ahora."""
+        assert self._f is not None
+        with self._lock:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._pendientes = 0
+            self._ultimo = time.monotonic()
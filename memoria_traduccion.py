@@ -0,0 +1,116 @@
+"""
+Memoria de traducción persistente (SQLite).
+
+Guarda la traducción de cada texto YA PROTEGIDO junto con el idioma de origen,
+el de destino y el modo de protección, para no volver a pedirlo al traductor.
+Al superar `max_entradas` se descartan las menos usadas recientemente (LRU).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable
+
+NOMBRE_DB = "memoria.sqlite3"
+COMMIT_CADA = 200  # escrituras entre commits
+CONSULTA_MAX = 500  # textos por consulta en contiene() (límite de parámetros)
+
+
+class MemoriaTraduccion:
+    def __init__(self, carpeta: Path, max_entradas: int = 500_000) -> None:
+        carpeta.mkdir(parents=True, exist_ok=True)
+        self.ruta = carpeta / NOMBRE_DB
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self.ruta, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS memoria ("
+            " origen TEXT, destino TEXT, modo TEXT, texto TEXT,"
+            " traduccion TEXT NOT NULL, uso INTEGER NOT NULL,"
+            " PRIMARY KEY (origen, destino, modo, texto))"
+        )
+        self._con.execute("CREATE INDEX IF NOT EXISTS memoria_uso ON memoria (uso)")
+        self._uso, self._total = self._con.execute(
+            "SELECT COALESCE(MAX(uso), 0), COUNT(*) FROM memoria"
+        ).fetchone()
+        self._pendientes = 0
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _toca(self) -> int:
+        self._uso += 1
+        self._pendientes += 1
+        if self._pendientes >= COMMIT_CADA:
+            self._con.commit()
+            self._pendientes = 0
+        return self._uso
+
+    def obtiene(self, texto: str, origen: str, destino: str, modo: str) -> str | None:
+        clave = (origen, destino, modo, texto)
+        with self._lock:
+            fila = self._con.execute(
+                "SELECT traduccion FROM memoria"
+                " WHERE origen=? AND destino=? AND modo=? AND texto=?",
+                clave,
+            ).fetchone()
+            if fila is None:
+                return None
+            self._con.execute(
+                "UPDATE memoria SET uso=?"
+                " WHERE origen=? AND destino=? AND modo=? AND texto=?",
+                (self._toca(), *clave),
+            )
+            return fila[0]
+
+    def contiene(
+        self, textos: Iterable[str], origen: str, destino: str, modo: str
+    ) -> set[str]:
+        """Cuáles de `textos` están en la memoria, sin marcarlos como usados
+        (para --plan)."""
+        textos = list(textos)
+        hallados: set[str] = set()
+        with self._lock:
+            for i in range(0, len(textos), CONSULTA_MAX):
+                trozo = textos[i : i + CONSULTA_MAX]
+                filas = self._con.execute(
+                    "SELECT texto FROM memoria WHERE origen=? AND destino=? AND"
+                    f" modo=? AND texto IN ({','.join('?' * len(trozo))})",
+                    (origen, destino, modo, *trozo),
+                )
+                hallados.update(fila[0] for fila in filas)
+        return hallados
+
+    def guarda(
+        self, texto: str, origen: str, destino: str, modo: str, traduccion: str
+    ) -> None:
+        with self._lock:
+            cur = self._con.execute(
+                "INSERT OR REPLACE INTO memoria VALUES (?, ?, ?, ?, ?, ?)",
+                (origen, destino, modo, texto, traduccion, self._toca()),
+            )
+            # INSERT OR REPLACE no dice si ya existía: se recuenta sólo al límite
+            self._total += cur.rowcount
+            if self._total > self.max_entradas:
+                self._desaloja()
+
+    def _desaloja(self) -> None:
+        # dejar un 10 % de holgura para no desalojar en cada inserción
+        self._total = self._con.execute("SELECT COUNT(*) FROM memoria").fetchone()[0]
+        sobran = self._total - int(self.max_entradas * 0.9)
+        if sobran > 0:
+            self._con.execute(
+                "DELETE FROM memoria WHERE rowid IN"
+                " (SELECT rowid FROM memoria ORDER BY uso LIMIT ?)",
+                (sobran,),
+            )
+            self._total -= sobran
+        self._con.commit()
+
+    def cierra(self) -> None:
+        with self._lock:
+            self._con.commit()
+            self._con.close()
@@ -0,0 +1,171 @@
+"""
+Métricas de la ejecución (--metrics / --trace).
+
+- Por petición al traductor: latencia, caracteres de entrada y salida y, si
+  falló, el motivo (nombre de la excepción).
+- Memoria de traducción: aciertos y fallos.
+- Reintentos: lotes que hubo que repetir cue a cue, con su motivo.
+- Por archivo: segundos de lectura, protección, traducción y escritura, cues y
+  cues que quedaron sin traducir.
+- Descubrimiento: segundos recorriendo el árbol de carpetas.
+
+`resumen()` agrega todo (p50/p95/p99 de latencia, peticiones/s, caracteres/s,
+tasa de aciertos de la memoria...) en un dict listo para volcar como JSON. Con
+`traza` cada petición se escribe además como una línea JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO, TypeVar
+
+FASES = ("leer", "proteger", "traducir", "escribir")
+T = TypeVar("T")
+
+
+def percentil(ordenados: list[float], p: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not ordenados:
+        return 0.0
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+class Metricas:
+    def __init__(self, traza: Path | None = None) -> None:
+        self.traza = traza
+        self._f: TextIO | None = None
+        self._lock = threading.Lock()
+        self._inicio = time.monotonic()
+        self.latencias: list[float] = []  # segundos, sólo peticiones correctas
+        self.peticiones = 0
+        self.chars_entrada = 0
+        self.chars_salida = 0
+        self.fallos: Counter[str] = Counter()
+        self.reintentos: Counter[str] = Counter()
+        self.cache_aciertos = 0
+        self.cache_fallos = 0
+        self.descubrir = 0.0
+        self.archivos: dict[str, dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys((*FASES, "cues", "sin_traducir"), 0)
+        )
+
+    def peticion(
+        self,
+        latencia: float,
+        texto: str,
+        traduccion: str | None = None,
+        error: BaseException | None = None,
+        idioma: str = "",
+    ) -> None:
+        with self._lock:
+            self.peticiones += 1
+            self.chars_entrada += len(texto)
+            if error is None:
+                self.latencias.append(latencia)
+                self.chars_salida += len(traduccion or "")
+            else:
+                self.fallos[type(error).__name__] += 1
+            if self.traza is not None:
+                if self._f is None:
+                    self._f = self.traza.open("w", encoding="utf-8")
+                fila = {
+                    "t": round(time.monotonic() - self._inicio, 4),
+                    "idioma": idioma,
+                    "latencia_ms": round(latencia * 1000, 2),
+                    "chars_entrada": len(texto),
+                    "chars_salida": len(traduccion or ""),
+                    "ok": error is None,
+                }
+                if error is not None:
+                    fila["motivo"] = f"{type(error).__name__}: {error}"
+                self._f.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+    def reintento(self, motivo: str, n: int = 1) -> None:
+        with self._lock:
+            self.reintentos[motivo] += n
+
+    def cache(self, aciertos: int, fallos: int) -> None:
+        with self._lock:
+            self.cache_aciertos += aciertos
+            self.cache_fallos += fallos
+
+    def cronometra_descubrir(self, iterable: Iterable[T]) -> Iterator[T]:
+        """Entrega los elementos de `iterable` sumando el tiempo que tarda en
+        producirlos (no el que se pasa procesándolos)."""
+        it = iter(iterable)
+        while True:
+            inicio = time.perf_counter()
+            elemento = next(it, None)
+            with self._lock:
+                self.descubrir += time.perf_counter() - inicio
+            if elemento is None:
+                return
+            yield elemento
+
+    def archivo(self, nombre: str, **valores: float) -> None:
+        """Suma `valores` (fases en segundos, cues...) a los de `nombre`."""
+        with self._lock:
+            fila = self.archivos[nombre]
+            for clave, valor in valores.items():
+                fila[clave] += valor
+
+    def resumen(self) -> dict:
+        with self._lock:
+            duracion = time.monotonic() - self._inicio
+            lat = sorted(self.latencias)
+            consultas = self.cache_aciertos + self.cache_fallos
+            return {
+                "duracion_s": round(duracion, 3),
+                "peticiones": {
+                    "total": self.peticiones,
+                    "fallidas": sum(self.fallos.values()),
+                    "fallos_por_motivo": dict(self.fallos),
+                    "reintentos": dict(self.reintentos),
+                    "por_seg": round(self.peticiones / duracion, 3) if duracion else 0,
+                    # lo que se aprovecha cada ida y vuelta al traductor
+                    "chars_media": (
+                        round(self.chars_entrada / self.peticiones, 1)
+                        if self.peticiones
+                        else 0
+                    ),
+                    "latencia_ms": {
+                        f"p{p}": round(percentil(lat, p) * 1000, 2)
+                        for p in (50, 95, 99)
+                    }
+                    | {"max": round(lat[-1] * 1000, 2) if lat else 0.0},
+                },
+                "chars": {
+                    "entrada": self.chars_entrada,
+                    "salida": self.chars_salida,
+                    "por_seg": (
+                        round(self.chars_entrada / duracion, 1) if duracion else 0
+                    ),
+                },
+                "cache": {
+                    "aciertos": self.cache_aciertos,
+                    "fallos": self.cache_fallos,
+                    "tasa_aciertos": (
+                        round(self.cache_aciertos / consultas, 4) if consultas else 0
+                    ),
+                },
+                "fases_s": {"descubrir": round(self.descubrir, 4)}
+                | {
+                    fase: round(sum(a[fase] for a in self.archivos.values()), 4)
+                    for fase in FASES
+                },
+                "archivos": {
+                    nombre: {k: round(v, 4) for k, v in fila.items()}
+                    for nombre, fila in self.archivos.items()
+                },
+            }
+
+    def cierra(self) -> None:
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
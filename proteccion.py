@@ -0,0 +1,207 @@
+"""
+Protección de lo que no se debe traducir: tipos de datos (TIPOS_DATO) y, con
+--use-dict, las palabras y frases del diccionario.
+
+En una sola pasada cada tramo protegido se sustituye por una marca corta y
+opaca (⟦0⟧, ⟦1⟧...) que el traductor deja tal cual, y el original se guarda en
+una tabla indexada. Al restaurar, también en una pasada, cada marca vuelve a
+su original y se valida el resultado: las marcas duplicadas o desconocidas se
+quitan y las que el traductor perdió se añaden al final de la frase.
+
+El diccionario se compila una sola vez: las entradas de un solo token van a un
+frozenset y las de varios tokens ("active directory", "go.mod",
+"line-through") a un trie de tokens, de modo que cada cue se recorre en una
+sola pasada (coste lineal en su longitud; la profundidad del trie está
+acotada por la frase más larga del diccionario).
+
+Los términos de los glosarios (--domains) se compilan en el mismo trie: se
+protegen igual, sin gastar caracteres de traducción, y `en_idioma` cambia sus
+originales por la traducción fija de cada idioma antes de restaurar.
+"""
+
+from __future__ import annotations
+
+import re
+from itertools import chain
+from typing import Iterable, Mapping, NamedTuple, Sequence
+
+# palabra | puntuación/espacios
+RE_TOKEN = re.compile(r"[A-Za-z0-9_]+|[^A-Za-z0-9_]+")
+RE_ESPACIOS = re.compile(r"\s+")
+MARCA = "⟦{}⟧"
+# el traductor a veces mete espacios dentro de la marca: ⟦ 0 ⟧
+RE_MARCA = re.compile(r"⟦\s*(\d+)\s*⟧")
+RE_FIN_FRASE = re.compile(r"[\s.!?…:;,]*$")
+_FIN = ""  # clave del trie que marca el final de una frase
+
+
+class Protegido(NamedTuple):
+    texto: str  # con marcas en lugar de lo protegido
+    originales: tuple[str, ...]  # originales[i] es lo que va en ⟦i⟧
+
+
+def _normaliza(token: str) -> str:
+    # cualquier tramo de espacios cuenta como uno: "active  directory" coincide
+    return " " if token.isspace() else RE_ESPACIOS.sub(" ", token.lower())
+
+
+def tokeniza(texto: str) -> list[str]:
+    return RE_TOKEN.findall(texto)
+
+
+def _clave(texto: str) -> str:
+    return "".join(_normaliza(t) for t in tokeniza(texto.strip()))
+
+
+def _mismo_caso(original: str, destino: str) -> str:
+    """`destino` con las mayúsculas de `original` ("Pullback" → "Retroceso")."""
+    if len(original) > 1 and original.isupper():
+        return destino.upper()
+    if original[:1].isupper():
+        return destino[:1].upper() + destino[1:]
+    return destino
+
+
+class Protector:
+    def __init__(
+        self,
+        palabras: Iterable[str] = (),
+        patron: re.Pattern | None = None,
+        terminos: Mapping[str, Mapping[str, str]] | None = None,
+    ) -> None:
+        self.patron = patron  # tramos protegidos siempre (tipos de datos)
+        # glosario: término (normalizado) → {idioma: traducción fija}
+        self.terminos = {_clave(t): dict(v) for t, v in (terminos or {}).items()}
+        sueltas: set[str] = set()
+        self.trie: dict = {}
+        for entrada in chain(palabras, terminos or ()):
+            tokens = [_normaliza(t) for t in tokeniza(entrada.strip())]
+            if len(tokens) == 1:
+                sueltas.add(tokens[0])
+            elif tokens:
+                nodo = self.trie
+                for tok in tokens:
+                    nodo = nodo.setdefault(tok, {})
+                nodo[_FIN] = True
+        self.palabras = frozenset(sueltas)
+
+    def _frase_mas_larga(self, tokens: list[str], inicio: int) -> int:
+        """Nº de tokens de la frase del trie más larga que empieza en `inicio`."""
+        nodo, largo = self.trie, 0
+        for i in range(inicio, len(tokens)):
+            nodo = nodo.get(_normaliza(tokens[i]))
+            if nodo is None:
+                break
+            if _FIN in nodo:
+                largo = i - inicio + 1
+        return largo
+
+    def _protege_palabras(
+        self, texto: str, salida: list[str], originales: list[str]
+    ) -> None:
+        if not self.palabras and not self.trie:
+            salida.append(texto)
+            return
+        tokens = tokeniza(texto)
+        i = 0
+        while i < len(tokens):
+            tok = tokens[i]
+            if not (tok[0].isalnum() or tok[0] == "_"):
+                salida.append(tok)
+                i += 1
+                continue
+            largo = self._frase_mas_larga(tokens, i) if tok.lower() in self.trie else 0
+            if not largo and tok.lower() in self.palabras:
+                largo = 1
+            if largo:
+                salida.append(MARCA.format(len(originales)))
+                originales.append("".join(tokens[i : i + largo]))
+                i += largo
+            else:
+                salida.append(tok)
+                i += 1
+
+    def protege(self, texto: str) -> Protegido:
+        salida: list[str] = []
+        originales: list[str] = []
+        previo = 0
+        if self.patron is not None:
+            for m in self.patron.finditer(texto):
+                self._protege_palabras(texto[previo : m.start()], salida, originales)
+                salida.append(MARCA.format(len(originales)))
+                originales.append(m.group(0))
+                previo = m.end()
+        self._protege_palabras(texto[previo:], salida, originales)
+        return Protegido("".join(salida), tuple(originales))
+
+    def en_idioma(self, originales: tuple[str, ...], idioma: str) -> tuple[str, ...]:
+        """Los originales que son términos del glosario, cambiados por su
+        traducción a `idioma` (los demás, y los que no la tienen, igual)."""
+        if not self.terminos:
+            return originales
+        salida = []
+        for original in originales:
+            destino = self.terminos.get(_clave(original), {}).get(idioma)
+            salida.append(
+                original if destino is None else _mismo_caso(original, destino)
+            )
+        return tuple(salida)
+
+
+def concatena(protegidos: Sequence[Protegido], sep: str = " ") -> Protegido:
+    """Une varios textos protegidos en uno, renumerando las marcas (para
+    traducir juntos los cues de una misma frase). Los saltos de línea de cada
+    cue se cambian por espacios: la frase viaja en una sola línea."""
+    partes: list[str] = []
+    originales: list[str] = []
+    for p in protegidos:
+        base = len(originales)
+        texto = p.texto.replace("\n", " ")
+        if base:
+            texto = RE_MARCA.sub(lambda m: MARCA.format(base + int(m.group(1))), texto)
+        partes.append(texto)
+        originales.extend(p.originales)
+    return Protegido(sep.join(partes), tuple(originales))
+
+
+def repara(traduccion: str, n: int) -> tuple[str, int]:
+    """Deja en la traducción exactamente las marcas ⟦0⟧..⟦n-1⟧, una vez cada
+    una; devuelve el texto y cuántas hubo que reparar (duplicadas,
+    desconocidas o perdidas)."""
+    vistas: set[int] = set()
+    reparadas = 0
+
+    def normaliza(m: re.Match) -> str:
+        nonlocal reparadas
+        i = int(m.group(1))
+        if i >= n or i in vistas:
+            reparadas += 1
+            return ""
+        vistas.add(i)
+        return MARCA.format(i)
+
+    texto = RE_MARCA.sub(normaliza, traduccion)
+    if reparadas:
+        texto = re.sub(r"[ \t]{2,}", " ", texto).strip()
+    faltan = [MARCA.format(i) for i in range(n) if i not in vistas]
+    if faltan:
+        # lo perdido se añade antes de la puntuación final
+        reparadas += len(faltan)
+        corte = RE_FIN_FRASE.search(texto).start()
+        texto = texto[:corte] + " " + " ".join(faltan) + texto[corte:]
+        texto = texto.lstrip()
+    return texto, reparadas
+
+
+def sustituye(texto: str, originales: tuple[str, ...]) -> str:
+    """Cambia cada marca (ya reparada) por su original."""
+    return RE_MARCA.sub(lambda m: originales[int(m.group(1))], texto)
+
+
+def restaura(traduccion: str, originales: tuple[str, ...]) -> tuple[str, int]:
+    """Vuelve a poner los originales; devuelve el texto y cuántas marcas hubo
+    que reparar (ver repara())."""
+    if not originales and "⟦" not in traduccion:
+        return traduccion, 0
+    texto, reparadas = repara(traduccion, len(originales))
+    return sustituye(texto, originales), reparadas
@@ -0,0 +1,134 @@
+"""
+Reintentos con espera exponencial y cortacircuitos para las peticiones al
+traductor.
+
+- `es_reintentable(exc)` separa los errores pasajeros (red, tiempo agotado,
+  HTTP 429/5xx) de los definitivos (idioma no soportado, texto no válido...),
+  que no se reintentan.
+- `PoliticaReintentos` decide cuántas veces se reintenta y cuánto se espera:
+  backoff exponencial con "full jitter" (un valor al azar entre 0 y
+  base·2^intento), para que los workers no reintenten todos a la vez.
+- `Interruptor` (circuit breaker) compartido por todos los workers: tras
+  `umbral` errores de limitación seguidos (429) se abre y nadie envía
+  peticiones durante `pausa` segundos. Después deja pasar una sola petición
+  de prueba: si va bien se cierra; si vuelve a limitar, se abre otra vez con
+  el doble de pausa (hasta `pausa_max`).
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import threading
+import time
+
+# excepciones de deep-translator (se comparan por nombre para no importarlo)
+_LIMITACION = {"TooManyRequests", "DemasiadasPeticiones"}
+_PASAJEROS = {"RequestError", "ServerException", "TranslationNotFound"}
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+def es_limitacion(exc: BaseException) -> bool:
+    """El servidor está limitando (HTTP 429)."""
+    return type(exc).__name__ in _LIMITACION or getattr(exc, "estado", None) == 429
+
+
+def es_reintentable(exc: BaseException) -> bool:
+    if es_limitacion(exc) or type(exc).__name__ in _PASAJEROS:
+        return True
+    estado = getattr(exc, "estado", None)
+    if estado is not None:
+        return estado == 408 or estado >= 500
+    # red caída, conexión cortada, tiempo agotado (requests también hereda
+    # de OSError). asyncio no se importa aquí: si no está cargado, ningún
+    # error puede venir de él
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is not None and isinstance(
+        exc, (asyncio.TimeoutError, asyncio.IncompleteReadError)
+    ):
+        return True
+    return isinstance(exc, OSError)
+
+
+class PoliticaReintentos:
+    def __init__(
+        self, intentos: int = 4, base: float = 0.5, maximo: float = 30.0
+    ) -> None:
+        self.intentos = max(0, intentos)
+        self.base = base
+        self.maximo = maximo
+
+    def espera(self, intento: int) -> float:
+        """Segundos a esperar antes del reintento nº `intento` (desde 0)."""
+        return random.uniform(0, min(self.maximo, self.base * 2**intento))
+
+    def reintenta(self, exc: BaseException, intento: int) -> bool:
+        return intento < self.intentos and es_reintentable(exc)
+
+
+class Interruptor:
+    def __init__(
+        self, umbral: int = 5, pausa: float = 30.0, pausa_max: float = 300.0
+    ) -> None:
+        self.umbral = max(1, umbral)
+        self.pausa_inicial = pausa
+        self.pausa_max = pausa_max
+        self.estado = CERRADO
+        self.aperturas = 0  # veces que se abrió (para el resumen final)
+        self._pausa = pausa
+        self._seguidos = 0
+        self._hasta = 0.0
+        self._lock = threading.Lock()
+
+    def _turno(self) -> float:
+        """0 si se puede enviar ya; si no, los segundos a esperar."""
+        with self._lock:
+            if self.estado == CERRADO:
+                return 0.0
+            ahora = time.monotonic()
+            if self.estado == ABIERTO:
+                if ahora >= self._hasta:
+                    self.estado = SEMIABIERTO  # esta petición es la de prueba
+                    return 0.0
+                return self._hasta - ahora
+            return min(1.0, self.pausa_inicial)  # esperando a la de prueba
+
+    def espera(self) -> None:
+        """Bloquea el hilo mientras el interruptor no deje pasar peticiones."""
+        while (espera := self._turno()) > 0:
+            time.sleep(espera)
+
+    async def espera_async(self) -> None:
+        import asyncio
+
+        while (espera := self._turno()) > 0:
+            await asyncio.sleep(espera)
+
+    def exito(self) -> None:
+        with self._lock:
+            if self.estado == ABIERTO:
+                # petición que ya estaba en vuelo antes de abrirse: la pausa
+                # sólo la termina la de prueba (SEMIABIERTO)
+                return
+            self.estado = CERRADO
+            self._seguidos = 0
+            self._pausa = self.pausa_inicial
+
+    def fallo(self, exc: BaseException) -> None:
+        with self._lock:
+            if not es_limitacion(exc):
+                # un error que no es de limitación no dice nada del ritmo
+                if self.estado == SEMIABIERTO:
+                    self.estado = CERRADO
+                return
+            self._seguidos += 1
+            if self.estado == SEMIABIERTO:
+                self._pausa = min(self.pausa_max, self._pausa * 2)
+            elif self.estado == ABIERTO or self._seguidos < self.umbral:
+                return
+            self.estado = ABIERTO
+            self.aperturas += 1
+            self._hasta = time.monotonic() + self._pausa
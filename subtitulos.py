@@ -0,0 +1,207 @@
+"""
+Modelo de cues y lectura/escritura de subtítulos VTT y SRT en streaming.
+
+- `lee_subtitulos` recorre el archivo bloque a bloque (los bloques van
+  separados por líneas en blanco) y entrega `Cue` o `Bloque`, sin cargar el
+  archivo entero en memoria.
+- `Cue` guarda identificador, inicio/fin en milisegundos, ajustes de cue VTT y
+  las líneas de texto. Sólo ese texto debe llegar al traductor.
+- `Bloque` es cualquier otra cosa (cabecera WEBVTT, NOTE, STYLE, REGION o un
+  bloque que no se pudo interpretar): se copia tal cual.
+- `a_tupla`/`de_tupla` pasan un elemento a tuplas de tipos básicos y de
+  vuelta, para enviarlo entre procesos (--procs) con poco coste.
+- `EscritorAtomico` escribe en un temporal junto al destino y sólo lo renombra
+  al destino si todo fue bien; si algo falla (o se llama a `descarta()`) el
+  destino anterior queda intacto.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Iterator, TextIO, Union
+
+_TIEMPO = r"(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})"
+# 00:01:02,500 --> 00:01:04,000   |   01:02.500 --> 01:04.000 align:start
+RE_TIEMPOS = re.compile(rf"^\s*{_TIEMPO}\s+-->\s+{_TIEMPO}(?:\s+(.*?))?\s*$")
+BLOQUES_VTT = ("WEBVTT", "NOTE", "STYLE", "REGION")
+
+
+class Cue:
+    __slots__ = ("id", "inicio", "fin", "ajustes", "lineas", "horas")
+
+    def __init__(
+        self,
+        id: str | None,
+        inicio: int,
+        fin: int,
+        lineas: list[str],
+        ajustes: str = "",
+        horas: bool = True,
+    ) -> None:
+        self.id = id
+        self.inicio = inicio  # ms
+        self.fin = fin  # ms
+        self.lineas = lineas
+        self.ajustes = ajustes  # "align:start position:10%" (sólo VTT)
+        self.horas = horas  # el original escribía las horas (VTT admite mm:ss.mmm)
+
+    @property
+    def texto(self) -> str:
+        return "\n".join(self.lineas).strip()
+
+    def con_texto(self, texto: str) -> Cue:
+        """Copia del cue con otro texto (p. ej. la traducción a un idioma)."""
+        return Cue(
+            self.id,
+            self.inicio,
+            self.fin,
+            texto.split("\n"),
+            self.ajustes,
+            self.horas,
+        )
+
+    def __repr__(self) -> str:
+        return f"Cue({self.id!r}, {self.inicio}, {self.fin}, {self.lineas!r})"
+
+
+class Bloque:
+    __slots__ = ("lineas",)
+
+    def __init__(self, lineas: list[str]) -> None:
+        self.lineas = lineas
+
+    def __repr__(self) -> str:
+        return f"Bloque({self.lineas!r})"
+
+
+Elemento = Union[Cue, Bloque]
+
+
+def _ms(h: str | None, m: str, s: str, ms: str) -> int:
+    return ((int(h or 0) * 60 + int(m)) * 60 + int(s)) * 1000 + int(ms)
+
+
+def formatea_tiempo(ms: int, formato: str, horas: bool = True) -> str:
+    h, resto = divmod(ms, 3_600_000)
+    m, resto = divmod(resto, 60_000)
+    s, ms = divmod(resto, 1000)
+    if formato == "srt":
+        return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+    if horas or h:
+        return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+    return f"{m:02d}:{s:02d}.{ms:03d}"
+
+
+def _bloques(f: TextIO) -> Iterator[list[str]]:
+    """Agrupa las líneas (sin salto final) en bloques separados por blancos."""
+    actual: list[str] = []
+    for lin in f:
+        lin = lin.rstrip("\r\n")
+        if lin.strip():
+            actual.append(lin)
+        elif actual:
+            yield actual
+            actual = []
+    if actual:
+        yield actual
+
+
+def _interpreta_cue(lineas: list[str]) -> Cue | None:
+    # el time-code va en la 1ª línea, o en la 2ª si hay identificador
+    for i in (0, 1):
+        if i < len(lineas) and (m := RE_TIEMPOS.match(lineas[i])):
+            g = m.groups()
+            return Cue(
+                lineas[0].strip() if i else None,
+                _ms(*g[0:4]),
+                _ms(*g[4:8]),
+                lineas[i + 1 :],
+                g[8] or "",
+                g[0] is not None,
+            )
+    return None
+
+
+def lee_subtitulos(ruta: Path, encoding: str = "utf-8") -> Iterator[Elemento]:
+    es_vtt = formato_de(ruta) == "vtt"
+    with ruta.open(encoding=encoding) as f:
+        for lineas in _bloques(f):
+            if es_vtt and lineas[0].lstrip("\ufeff").startswith(BLOQUES_VTT):
+                yield Bloque(lineas)
+            else:
+                yield _interpreta_cue(lineas) or Bloque(lineas)
+
+
+def formato_de(ruta: Path) -> str:
+    return "vtt" if ruta.suffix.lower() == ".vtt" else "srt"
+
+
+def a_tupla(elemento: Elemento) -> tuple:
+    """Forma compacta de un elemento para pasarlo entre procesos: sólo tipos
+    básicos, sin una referencia a la clase por elemento como haría pickle."""
+    if isinstance(elemento, Bloque):
+        return (elemento.lineas,)
+    c = elemento
+    return (c.id, c.inicio, c.fin, c.lineas, c.ajustes, c.horas)
+
+
+def de_tupla(t: tuple) -> Elemento:
+    return Bloque(t[0]) if len(t) == 1 else Cue(*t)
+
+
+def serializa(elemento: Elemento, formato: str) -> str:
+    if isinstance(elemento, Bloque):
+        return "".join(lin + "\n" for lin in elemento.lineas)
+    cue = elemento
+    tiempos = (
+        f"{formatea_tiempo(cue.inicio, formato, cue.horas)} --> "
+        f"{formatea_tiempo(cue.fin, formato, cue.horas)}"
+    )
+    if cue.ajustes and formato == "vtt":
+        tiempos += " " + cue.ajustes
+    cabecera = f"{cue.id}\n{tiempos}\n" if cue.id is not None else f"{tiempos}\n"
+    return cabecera + "".join(lin + "\n" for lin in cue.lineas)
+
+
+class EscritorSubtitulos:
+    """Escribe elementos separados por una línea en blanco."""
+
+    def __init__(self, f: TextIO, formato: str) -> None:
+        self.f = f
+        self.formato = formato
+        self._primero = True
+
+    def escribe(self, elemento: Elemento) -> None:
+        if not self._primero:
+            self.f.write("\n")
+        self._primero = False
+        self.f.write(serializa(elemento, self.formato))
+
+
+class EscritorAtomico:
+    """Context manager: `with EscritorAtomico(ruta) as f: f.write(...)`."""
+
+    def __init__(self, ruta: Path, encoding: str = "utf-8") -> None:
+        self.ruta = ruta
+        self.tmp = ruta.with_name(ruta.name + ".tmp")
+        self.encoding = encoding
+        self.descartado = False
+        self._f: TextIO | None = None
+
+    def __enter__(self) -> TextIO:
+        self._f = self.tmp.open("w", encoding=self.encoding)
+        return self._f
+
+    def __exit__(self, tipo, exc, tb) -> None:
+        assert self._f is not None
+        self._f.close()
+        if tipo is None and not self.descartado:
+            os.replace(self.tmp, self.ruta)
+        else:
+            self.tmp.unlink(missing_ok=True)
+
+    def descarta(self) -> None:
+        """Al salir, borra el temporal en lugar de reemplazar el destino."""
+        self.descartado = True
@@ -5,12 +5,62 @@ Ejecutar: python test_metodos.py
 """
 
 from pathlib import Path
+import argparse
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import html
+import json
 import shutil
+import subprocess
+import sys
+import threading
+import time
+import traduce
+import bench_traduce
+from backends import Backend, crea_backend
+from limitador import LimitadorTasa
+from manifiesto import (
+    AL_DIA,
+    CAMBIADO,
+    NUEVO,
+    EscritorRegistro,
+    Manifiesto,
+    lee_parcial,
+    lee_registro,
+)
+from memoria_traduccion import MemoriaTraduccion
+from metricas import Metricas, percentil
+from proteccion import Protector, Protegido, concatena
+from proteccion import restaura as restaura_marcas
+from reintentos import (
+    ABIERTO,
+    CERRADO,
+    Interruptor,
+    PoliticaReintentos,
+    es_reintentable,
+)
+from diccionario_no_traducir import PALABRAS
+from empaquetador import Empaquetador, parte_texto, une
+from frases import agrupa_frases, equilibra_lineas, reparte
+from subtitulos import (
+    Bloque,
+    Cue,
+    EscritorAtomico,
+    EscritorSubtitulos,
+    a_tupla,
+    de_tupla,
+    lee_subtitulos,
+)
+from traductor_async import GoogleAsync, DemasiadasPeticiones, ErrorHTTP
 from traduce import (
     nombre_traducido,
     ya_esta_traducido,
     TIPOS_DATO,
     mover_originales_al_final,
+    arma_lotes,
+    separa_lote,
+    traduce_lotes,
 )
 
 # ---------- casos de prueba ----------
@@ -98,10 +148,972 @@ def test_mover():
     print("✅ Test mover_originales_al_final() PASS")
 
 
+class BackendFalso(Backend):
+    """Backend sin red que pasa el texto a mayúsculas."""
+
+    def __init__(self):
+        super().__init__("en", "es")
+        self.llamadas = 0
+
+    def _traduce(self, texto):
+        self.llamadas += 1
+        return texto.upper()
+
+
+def test_lotes():
+    print("Test: traducción por lotes")
+    textos = ["hola", "que tal", "adios"]
+    assert arma_lotes(textos, 0) == [[0], [1], [2]]
+    assert arma_lotes(textos, 1000) == [[0, 1, 2]]
+    assert arma_lotes(textos, 20) == [[0], [1], [2]]
+
+    assert separa_lote("@@0@@\nA\n@ @1@@\nB", 2) == ["A", "B"]
+    assert separa_lote("@@0@@\nA B", 2) is None  # separador perdido
+
+    falso = BackendFalso()
+    original, traduce.BACKENDS_ACTIVOS = traduce.BACKENDS_ACTIVOS, {"es": falso}
+    try:
+        assert traduce_lotes([textos]) == [["HOLA", "QUE TAL", "ADIOS"]]
+        assert falso.llamadas == 1
+
+        # un lote limitado (429) no se repite cue a cue: queda para la pasada
+        # de reintento; uno rechazado por su contenido, sí
+        class Falla(BackendFalso):
+            error = DemasiadasPeticiones(429)
+
+            def _traduce(self, texto):
+                self.llamadas += 1
+                raise self.error
+
+        diez = [f"cue {i}" for i in range(10)]
+        limitado = Falla()
+        traduce.BACKENDS_ACTIVOS = {"es": limitado}
+        assert traduce_lotes([diez]) == [[None] * 10]
+        assert limitado.llamadas == 1
+        rechazado = Falla()
+        rechazado.error = ValueError("contenido rechazado")
+        traduce.BACKENDS_ACTIVOS = {"es": rechazado}
+        assert traduce_lotes([diez]) == [[None] * 10]
+        assert rechazado.llamadas == 11
+    finally:
+        traduce.BACKENDS_ACTIVOS = original
+    print("✅ PASS\n")
+
+
+def test_escritor_atomico():
+    print("Test: EscritorAtomico no deja temporales ni archivos a medias")
+    tmp = Path("test_atomico_tmp")
+    tmp.mkdir(exist_ok=True)
+    destino = tmp / "salida_esp.vtt"
+    destino.write_text("viejo", encoding="utf-8")
+    with EscritorAtomico(destino) as f:
+        f.write("nue")
+        f.write("vo")
+    assert destino.read_text(encoding="utf-8") == "nuevo"
+    try:
+        with EscritorAtomico(destino) as f:
+            f.write("a medias")
+            raise RuntimeError("corte")
+    except RuntimeError:
+        pass
+    assert destino.read_text(encoding="utf-8") == "nuevo"
+    assert [p.name for p in tmp.iterdir()] == ["salida_esp.vtt"]
+    shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_subtitulos_vtt_srt():
+    print("Test: lee_subtitulos() y EscritorSubtitulos (VTT y SRT)")
+    for ruta in (Path("Examples/vtt/file_en.vtt"), Path("Examples/srt/file_en.srt")):
+        elementos = list(lee_subtitulos(ruta))
+        cues = [e for e in elementos if isinstance(e, Cue)]
+        assert cues and all(c.texto for c in cues)
+        # sin cambios, se vuelve a escribir idéntico
+        tmp = Path("test_subtitulos_tmp" + ruta.suffix)
+        with EscritorAtomico(tmp) as f:
+            escritor = EscritorSubtitulos(f, ruta.suffix[1:])
+            for e in elementos:
+                escritor.escribe(e)
+        assert tmp.read_text(encoding="utf-8") == ruta.read_text(encoding="utf-8")
+        tmp.unlink()
+
+    vtt = list(lee_subtitulos(Path("Examples/vtt/file_en.vtt")))
+    assert isinstance(vtt[0], Bloque) and vtt[0].lineas == ["WEBVTT"]
+    assert (vtt[1].id, vtt[1].inicio, vtt[1].fin) == ("0", 240, 2250)
+    assert vtt[1].texto == "Now let's try something."
+
+    srt = next(lee_subtitulos(Path("Examples/srt/file_en.srt")))
+    assert (srt.id, srt.inicio, srt.fin) == ("1", 6600, 9570)
+    assert srt.lineas == ["- Let's imagine we", "define a simple enum type"]
+
+    tmp = Path("test_bloques_tmp.vtt")
+    tmp.write_text(
+        "WEBVTT\n\nNOTE no se traduce\n\nSTYLE\n::cue { color: red }\n\n"
+        "intro\n01:00:01.000 --> 01:00:02.500 align:start\nHello\n",
+        encoding="utf-8",
+    )
+    *bloques, cue = lee_subtitulos(tmp)
+    assert [type(b) for b in bloques] == [Bloque, Bloque, Bloque]
+    assert (cue.id, cue.inicio, cue.ajustes) == ("intro", 3_601_000, "align:start")
+    tmp.unlink()
+    print("✅ PASS\n")
+
+
+def test_limitador():
+    print("Test: LimitadorTasa (ráfaga, ritmo y backoff)")
+    lim = LimitadorTasa(20, rafaga=3)
+    t0 = time.monotonic()
+    for _ in range(3):
+        lim.adquiere()  # la ráfaga sale sin espera
+    assert time.monotonic() - t0 < 0.05
+    lim.adquiere()  # la 4ª espera ~1/20 s
+    assert time.monotonic() - t0 >= 0.04
+
+    lim.fallo()
+    assert lim.tasa == 10
+    for _ in range(20):
+        lim.exito()
+    assert lim.tasa == 20  # nunca pasa de la tasa configurada
+    print("✅ PASS\n")
+
+
+def test_memoria_traduccion():
+    print("Test: MemoriaTraduccion (persistencia y desalojo LRU)")
+    tmp = Path("test_memoria_tmp")
+    mem = MemoriaTraduccion(tmp, max_entradas=10)
+    mem.guarda("Dot brown.", "en", "es", "types-only", "Punto marrón.")
+    assert mem.obtiene("Dot brown.", "en", "es", "types-only") == "Punto marrón."
+    assert mem.obtiene("Dot brown.", "en", "es", "dict+types") is None
+    assert mem.obtiene("Dot brown.", "en", "pt", "types-only") is None
+
+    for i in range(10):
+        mem.guarda(f"texto {i}", "en", "es", "types-only", f"trad {i}")
+        mem.obtiene("Dot brown.", "en", "es", "types-only")  # se mantiene "caliente"
+    assert len(mem) <= 10
+    assert mem.obtiene("texto 0", "en", "es", "types-only") is None  # desalojado
+    mem.cierra()
+
+    mem = MemoriaTraduccion(tmp, max_entradas=10)  # sigue ahí al reabrir
+    assert mem.obtiene("Dot brown.", "en", "es", "types-only") == "Punto marrón."
+    mem.cierra()
+    shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_duplicados():
+    print("Test: traduce_textos() traduce cada texto distinto una vez")
+    falso = BackendFalso()
+    original, cache = traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE
+    traduce.BACKENDS_ACTIVOS = {"es": falso}
+    traduce.USAR_CACHE, traduce.MAX_CHARS_LOTE = False, 0  # un cue por petición
+    try:
+        textos = ["Dot brown.", "Let's get started.", "Dot brown.", "Dot brown."]
+        assert traduce.traduce_textos(textos, barra=False) == [
+            t.upper() for t in textos
+        ]
+        assert falso.llamadas == 2
+        # entre archivos de la misma ejecución tampoco se repite
+        assert traduce.traduce_textos(["Dot brown."], barra=False) == ["DOT BROWN."]
+        assert falso.llamadas == 2
+        assert traduce.ESTADISTICAS["textos"] >= 5
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE = original, cache
+        traduce.MAX_CHARS_LOTE = traduce.LOTE_MAX_CHARS
+    print("✅ PASS\n")
+
+
+class GoogleLocal(BaseHTTPRequestHandler):
+    """Imita el endpoint móvil de Google: devuelve `q` en mayúsculas."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        q = parse_qs(urlsplit(self.path).query)["q"][0]
+        if q == "limite":
+            self.send_response(429)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        cuerpo = f'<div class="result-container">{html.escape(q.upper())}</div>'
+        datos = cuerpo.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_traductor_async():
+    print("Test: GoogleAsync contra un servidor local")
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), GoogleLocal)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/m"
+    tr = GoogleAsync(
+        "en", "es", en_vuelo=2, limitador=LimitadorTasa(1000, 1000), url=url
+    )
+    try:
+        textos = [f"cue {i} <b>&" for i in range(8)]
+        assert tr.translate_batch(textos) == [t.upper() for t in textos]
+        assert tr.translate("otra vez") == "OTRA VEZ"
+        assert tr.conexiones_abiertas <= 2  # las conexiones se reutilizan
+
+        resultado = tr.translate_batch(["hola", "limite"])
+        assert resultado[0] == "HOLA"
+        assert isinstance(resultado[1], DemasiadasPeticiones)
+    finally:
+        tr.cierra()
+        servidor.shutdown()
+        servidor.server_close()
+    print("✅ PASS\n")
+
+
+def test_backend_mock():
+    print("Test: backend mock (determinista, respeta marcas ⟦N⟧ y separadores)")
+    mock = crea_backend("mock", "en", "es")
+    assert mock.translate("Vec<T> ⟦0⟧ hello") == "ceV<T> ⟦0⟧ olleh"
+    assert mock.translate_batch(["ab", "cd"]) == ["ba", "dc"]
+    assert mock.peticiones == 3
+
+    original, traduce.BACKENDS_ACTIVOS = traduce.BACKENDS_ACTIVOS, {"es": mock}
+    try:
+        assert traduce_lotes([["hello", "⟦0⟧ world"]]) == [["olleh", "⟦0⟧ dlrow"]]
+        assert mock.peticiones == 4  # un único lote
+    finally:
+        traduce.BACKENDS_ACTIVOS = original
+    print("✅ PASS\n")
+
+
+def test_protector():
+    print("Test: Protector (palabras y frases del diccionario)")
+    prot = Protector(PALABRAS)
+    assert prot.protege("Open a reverse shell now") == (
+        "Open a ⟦0⟧ now",
+        ("reverse shell",),
+    )
+    assert prot.protege("We manage the Active  Directory") == (
+        "We manage the ⟦0⟧",
+        ("Active  Directory",),
+    )
+    assert prot.protege("edit go.mod and go") == ("edit ⟦0⟧ and ⟦1⟧", ("go.mod", "go"))
+    assert prot.protege("a 0day in 3 apps") == ("a ⟦0⟧ in 3 apps", ("0day",))
+    # los tipos de datos y el diccionario se protegen en la misma pasada
+    prot = Protector(PALABRAS, TIPOS_DATO)
+    assert prot.protege("use Vec<T> in go") == ("use ⟦0⟧ in ⟦1⟧", ("Vec<T>", "go"))
+    assert Protector((), TIPOS_DATO).protege("plain text") == ("plain text", ())
+    print("✅ PASS\n")
+
+
+def test_restaura_marcas():
+    print("Test: restaurar marcas ⟦N⟧ validando perdidas y duplicadas")
+    originales = ("i64", "Vec<T>")
+    assert restaura_marcas("usa ⟦0⟧ y ⟦1⟧.", originales) == ("usa i64 y Vec<T>.", 0)
+    # el traductor metió espacios o cambió el orden: sigue valiendo
+    assert restaura_marcas("⟦ 1 ⟧ con ⟦0 ⟧", originales) == ("Vec<T> con i64", 0)
+    # duplicada: sólo cuenta la primera; desconocida: se quita
+    assert restaura_marcas("⟦0⟧ y ⟦0⟧ y ⟦7⟧ y ⟦1⟧", originales) == (
+        "i64 y y y Vec<T>",
+        2,
+    )
+    # perdida: se añade antes de la puntuación final
+    assert restaura_marcas("usa ⟦1⟧ ahora.", originales) == ("usa Vec<T> ahora i64.", 1)
+    assert restaura_marcas("sin marcas", ()) == ("sin marcas", 0)
+
+    # de punta a punta ninguna marca llega a la salida, ni si falla
+    falso = BackendFalso()
+    guardado = (traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE)
+    traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE = {"es": falso}, False
+    try:
+        assert traduce.traduce_textos(["take an i64 or a u32"], barra=False) == [
+            "TAKE AN i64 OR A u32"
+        ]
+        # sólo marcas: no se envía
+        llamadas = falso.llamadas
+        assert traduce.traduce_textos(["Vec<T>"], barra=False) == ["Vec<T>"]
+        assert falso.llamadas == llamadas
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE = guardado
+    print("✅ PASS\n")
+
+
+def test_manifiesto():
+    print("Test: Manifiesto (saltar por stat, detectar cambios de fuente/modo)")
+    tmp = Path("test_manifiesto_tmp")
+    (tmp / "esp").mkdir(parents=True, exist_ok=True)
+    orig = tmp / "clase.vtt"
+    trad = tmp / "esp" / "clase_esp.vtt"
+    orig.write_text("WEBVTT\n\n00:01.000 --> 00:02.000\nHello\n", encoding="utf-8")
+    trad.write_text("WEBVTT\n\n00:01.000 --> 00:02.000\nHola\n", encoding="utf-8")
+    firma = {"backend": "google", "modo": "types-only"}
+
+    man = Manifiesto(tmp / "esp")
+    assert man.estado(orig, trad, firma) == NUEVO
+    man.registra(orig, trad, firma)
+    man.guarda()
+    man = Manifiesto(tmp / "esp")  # se relee del disco
+    assert man.estado(orig, trad, firma) == AL_DIA
+    assert man.estado(orig, trad, {**firma, "modo": "dict+types"}) == CAMBIADO
+
+    orig.write_text(orig.read_text(encoding="utf-8"), encoding="utf-8")  # "touch"
+    assert man.estado(orig, trad, firma) == AL_DIA
+    orig.write_text("WEBVTT\n\n00:01.000 --> 00:02.000\nHi!!!\n", encoding="utf-8")
+    assert man.estado(orig, trad, firma) == CAMBIADO
+    shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_registro_cues():
+    print("Test: registro cue a cue para --incremental")
+    tmp = Path("test_registro_tmp")
+    tmp.mkdir(exist_ok=True)
+    orig = tmp / "clase.vtt"
+    firma = {"backend": "google", "modo": "types-only"}
+    with EscritorRegistro(tmp, orig, firma) as reg:
+        reg.anota("Dot brown.", "Punto marrón.")
+        reg.anota("Let's get started.", "Empecemos.")
+    assert lee_registro(tmp, orig, firma) == {
+        "Dot brown.": "Punto marrón.",
+        "Let's get started.": "Empecemos.",
+    }
+    # con otra firma no se reutiliza nada
+    assert lee_registro(tmp, orig, {**firma, "modo": "dict+types"}) == {}
+    # si el archivo falla a medias, el registro anterior se conserva
+    try:
+        with EscritorRegistro(tmp, orig, firma) as reg:
+            reg.anota("Dot brown.", "otra")
+            raise RuntimeError("corte")
+    except RuntimeError:
+        pass
+    assert lee_registro(tmp, orig, firma)["Dot brown."] == "Punto marrón."
+    shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+class Corte(BaseException):
+    """Simula que el proceso muere a mitad de un archivo."""
+
+
+def test_reanuda():
+    print("Test: --resume reutiliza los cues traducidos antes del corte")
+    tmp = Path("test_reanuda_tmp")
+    tmp.mkdir(exist_ok=True)
+    origen = tmp / "clase.srt"
+    origen.write_text(
+        "".join(
+            f"{i}\n00:00:0{i},000 --> 00:00:0{i},500\nResume cue {i}.\n\n"
+            for i in range(1, 5)
+        ),
+        encoding="utf-8",
+    )
+
+    class CorteAlTercero(BackendFalso):
+        corte = 2
+
+        def _traduce(self, texto):
+            if self.llamadas == self.corte:
+                raise Corte
+            return super()._traduce(texto)
+
+    guardado = (
+        traduce.BACKENDS_ACTIVOS,
+        traduce.USAR_CACHE,
+        traduce.MAX_CHARS_LOTE,
+        traduce.REANUDA,
+    )
+    # una petición por cue, todo en una ventana y sin memoria: sólo queda lo
+    # que se anotó en el registro parcial a medida que volvían las peticiones
+    traduce.USAR_CACHE, traduce.MAX_CHARS_LOTE = False, 0
+    try:
+        traduce.BACKENDS_ACTIVOS = {"es": CorteAlTercero()}
+        try:
+            traduce.traduce_archivo(origen, barra=False)
+            assert False, "debía cortarse"
+        except Corte:
+            pass
+        salida = tmp / "esp" / "clase_esp.srt"
+        assert not salida.exists()
+        firma = traduce.FIRMA
+        assert lee_parcial(tmp / "esp", origen, firma) == {
+            "Resume cue 1.": "RESUME CUE 1.",
+            "Resume cue 2.": "RESUME CUE 2.",
+        }
+
+        # se vuelve a cortar antes de traducir nada: lo anterior se conserva
+        traduce._memo.clear()  # como si fuera otro proceso
+        corte = CorteAlTercero()
+        corte.corte = 0
+        traduce.BACKENDS_ACTIVOS, traduce.REANUDA = {"es": corte}, True
+        try:
+            traduce.traduce_archivo(origen, barra=False)
+            assert False, "debía cortarse"
+        except Corte:
+            pass
+        assert len(lee_parcial(tmp / "esp", origen, firma)) == 2
+
+        traduce._memo.clear()
+        falso = BackendFalso()
+        traduce.BACKENDS_ACTIVOS, traduce.REANUDA = {"es": falso}, True
+        traduce.traduce_archivo(origen, barra=False)
+        assert falso.llamadas == 2  # sólo los cues 3 y 4
+        assert "RESUME CUE 1." in salida.read_text(encoding="utf-8")
+        assert len(lee_registro(tmp / "esp", origen, firma)) == 4
+    finally:
+        (
+            traduce.BACKENDS_ACTIVOS,
+            traduce.USAR_CACHE,
+            traduce.MAX_CHARS_LOTE,
+            traduce.REANUDA,
+        ) = guardado
+        shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_descubre():
+    print("Test: descubre() recorre una vez, poda en/ y esp/ y agrupa por carpeta")
+    tmp = Path("test_descubre_tmp")
+    for rel in (
+        "b/leccion2_en.vtt",
+        "b/leccion1.srt",
+        "b/en/leccion0_en.vtt",
+        "b/esp/leccion1_esp.srt",
+        "a/video.mp4",
+        "a/intro.VTT",
+        "a/sub/en/x.vtt",
+        "a/sub/clase-en.srt",
+        "raiz.vtt",
+    ):
+        (tmp / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp / rel).write_text("", encoding="utf-8")
+    encontrados = [
+        (str(p.relative_to(tmp)), original) for p, original in traduce.descubre(tmp)
+    ]
+    assert encontrados == [
+        ("raiz.vtt", False),
+        ("a/intro.VTT", False),
+        ("a/sub/clase-en.srt", True),
+        ("b/leccion1.srt", False),
+        ("b/leccion2_en.vtt", True),
+    ], encontrados
+    shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_varios_idiomas():
+    print("Test: traduce_archivo() lee una vez y escribe cada idioma de --targets")
+    tmp = Path("test_idiomas_tmp")
+    tmp.mkdir(exist_ok=True)
+    origen = tmp / "clase.srt"
+    origen.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nMulti target cue.\n\n"
+        "2\n00:00:02,000 --> 00:00:03,000\nSecond target cue.\n",
+        encoding="utf-8",
+    )
+    falsos = {"es": BackendFalso(), "pt": BackendFalso()}
+    guardado = (traduce.BACKENDS_ACTIVOS, traduce.DESTINOS, traduce.USAR_CACHE)
+    traduce.BACKENDS_ACTIVOS, traduce.DESTINOS = dict(falsos), ["es", "pt"]
+    traduce.USAR_CACHE = False
+    try:
+        salidas = traduce.traduce_archivo(origen, barra=False)
+        assert salidas == [tmp / "esp" / "clase_esp.srt", tmp / "por" / "clase_por.srt"]
+        for ruta in salidas:
+            assert "SECOND TARGET CUE." in ruta.read_text(encoding="utf-8")
+        assert [f.llamadas for f in falsos.values()] == [1, 1]
+        # la segunda vez ambos idiomas están al día
+        assert traduce.traduce_archivo(origen, barra=False) == []
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.DESTINOS, traduce.USAR_CACHE = guardado
+        shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_metricas():
+    print("Test: métricas por petición, resumen y traza JSONL")
+    assert percentil([], 50) == 0.0
+    assert percentil([1, 2, 3, 4], 50) == 2
+    assert percentil(list(range(1, 101)), 99) == 99
+
+    traza = Path("test_traza_tmp.jsonl")
+    metricas = Metricas(traza)
+    mock = crea_backend("mock", "en", "es", metricas=metricas)
+    mock.translate("hello")
+    metricas.peticion(0.2, "boom", error=TimeoutError("lento"), idioma="es")
+    metricas.cache(3, 1)
+    metricas.reintento("separadores perdidos", 2)
+    metricas.archivo("a.vtt", traducir=0.5, cues=4)
+    metricas.archivo("a.vtt", traducir=0.25, sin_traducir=1)
+    resumen = metricas.resumen()
+    metricas.cierra()
+
+    assert resumen["peticiones"]["total"] == 2
+    assert resumen["peticiones"]["fallos_por_motivo"] == {"TimeoutError": 1}
+    assert resumen["peticiones"]["reintentos"] == {"separadores perdidos": 2}
+    assert resumen["chars"] == {**resumen["chars"], "entrada": 9, "salida": 5}
+    assert resumen["cache"]["tasa_aciertos"] == 0.75
+    assert resumen["archivos"]["a.vtt"]["traducir"] == 0.75
+    assert resumen["archivos"]["a.vtt"]["sin_traducir"] == 1
+    filas = [json.loads(l) for l in traza.read_text(encoding="utf-8").splitlines()]
+    assert [f["ok"] for f in filas] == [True, False]
+    assert filas[1]["motivo"] == "TimeoutError: lento"
+    traza.unlink()
+    print("✅ PASS\n")
+
+
+def test_bench_corpus():
+    print("Test: bench_traduce genera un corpus sintético legible")
+    tmp = Path("test_bench_tmp")
+    params = argparse.Namespace(
+        archivos=3,
+        cues=40,
+        largo_cue=50,
+        repeticion=0.5,
+        densidad_codigo=0.3,
+        formato="mixto",
+        por_carpeta=2,
+        semilla=7,
+    )
+    totales = bench_traduce.genera_corpus(tmp, params)
+    archivos = sorted(tmp.rglob("*.*"))
+    assert [p.suffix for p in archivos] == [".vtt", ".srt", ".vtt"]
+    cues = [e for p in archivos for e in lee_subtitulos(p) if isinstance(e, Cue)]
+    assert len(cues) == totales["cues"] == 120
+    assert sum(len(c.texto) for c in cues) == totales["chars"]
+    textos = [c.texto for c in cues]
+    assert len(set(textos)) < len(textos)  # hay repetidos
+    assert any(TIPOS_DATO.search(t) for t in textos)  # y tokens de código
+    # tal cual, sin pasar a minúsculas
+    corpus = " ".join(textos).replace("\n", " ")
+    assert all(t in corpus for t in bench_traduce.TOKENS_CODIGO)
+    assert "vec<t>" not in corpus and "hashmap" not in corpus
+    shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_reintentos():
+    print("Test: reintentos con backoff, errores definitivos e interruptor")
+    assert es_reintentable(DemasiadasPeticiones(429))
+    assert es_reintentable(ErrorHTTP(503))
+    assert es_reintentable(ConnectionResetError())
+    assert es_reintentable(TimeoutError())
+    assert not es_reintentable(ErrorHTTP(404))
+    assert not es_reintentable(ValueError("vacío"))
+    politica = PoliticaReintentos(intentos=3, base=0.01, maximo=0.03)
+    assert all(0 <= politica.espera(n) <= 0.03 for n in range(10))
+
+    class Inestable(BackendFalso):
+        def __init__(self, error, fallos):
+            super().__init__()
+            self.reintentos = politica
+            self.error, self.fallos = error, fallos
+
+        def _traduce(self, texto):
+            if self.fallos:
+                self.fallos -= 1
+                self.llamadas += 1
+                raise self.error
+            return super()._traduce(texto)
+
+    pasajero = Inestable(ConnectionResetError("cortada"), 2)
+    assert pasajero.translate("hola") == "HOLA"
+    assert pasajero.llamadas == 3
+    definitivo = Inestable(ValueError("texto no válido"), 2)
+    assert isinstance(definitivo.translate_batch(["hola"])[0], ValueError)
+    assert definitivo.llamadas == 1  # no se reintenta
+
+    # 3 errores 429 seguidos abren el interruptor: nadie envía en 0.1 s
+    interruptor = Interruptor(umbral=3, pausa=0.1)
+    for _ in range(3):
+        interruptor.fallo(DemasiadasPeticiones(429))
+    assert interruptor.estado == ABIERTO and interruptor.aperturas == 1
+    # una petición que ya estaba en vuelo y acaba bien no corta la pausa
+    interruptor.exito()
+    assert interruptor.estado == ABIERTO and interruptor._turno() > 0
+    inicio = time.monotonic()
+    interruptor.espera()  # pasa la petición de prueba
+    assert time.monotonic() - inicio >= 0.09
+    interruptor.fallo(DemasiadasPeticiones(429))  # la prueba vuelve a limitar
+    assert interruptor.estado == ABIERTO and interruptor.aperturas == 2
+    interruptor.espera()
+    interruptor.exito()
+    assert interruptor.estado == CERRADO
+    print("✅ PASS\n")
+
+
+def test_cues_pendientes():
+    print("Test: los cues fallidos no se dan por traducidos y se reintentan")
+    tmp = Path("test_pendientes_tmp")
+    tmp.mkdir(exist_ok=True)
+    origen = tmp / "clase.srt"
+    origen.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nPending cue one.\n\n"
+        "2\n00:00:02,000 --> 00:00:03,000\nPending cue two.\n",
+        encoding="utf-8",
+    )
+
+    class FallaDos(BackendFalso):
+        def _traduce(self, texto):
+            if "two" in texto:
+                raise ValueError("rechazado")
+            return super()._traduce(texto)
+
+    guardado = (traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE, traduce.MAX_CHARS_LOTE)
+    traduce.USAR_CACHE, traduce.MAX_CHARS_LOTE = False, 0
+    try:
+        traduce.BACKENDS_ACTIVOS = {"es": FallaDos()}
+        traduce.traduce_archivo(origen, barra=False)
+        assert traduce.PENDIENTES == [origen]
+        salida = tmp / "esp" / "clase_esp.srt"
+        # no se publica con el cue fallido en inglés; sólo queda el registro
+        assert not salida.exists() and not list((tmp / "esp").glob("*.tmp"))
+        assert lee_registro(tmp / "esp", origen, traduce.FIRMA) == {
+            "Pending cue one.": "PENDING CUE ONE."
+        }
+        manifiesto = traduce.manifiesto_de(tmp / "esp")
+        assert manifiesto.estado(origen, salida, traduce.FIRMA) == NUEVO
+
+        # la pasada de reintento sólo pide el cue que faltaba
+        traduce.PENDIENTES.clear()
+        traduce._memo.clear()
+        falso = BackendFalso()
+        traduce.BACKENDS_ACTIVOS = {"es": falso}
+        traduce.traduce_archivo(origen, barra=False)
+        assert falso.llamadas == 1 and not traduce.PENDIENTES
+        assert "PENDING CUE TWO." in salida.read_text(encoding="utf-8")
+        assert manifiesto.estado(origen, salida, traduce.FIRMA) == AL_DIA
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE, traduce.MAX_CHARS_LOTE = guardado
+        traduce.PENDIENTES.clear()
+        shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_empaquetado():
+    print("Test: cues largos partidos por frases y paquetes entre workers")
+    texto = "First sentence here. Second one is longer! Third?"
+    trozos, seps = parte_texto(texto, 25)
+    assert trozos == ["First sentence here.", "Second one is longer!", "Third?"]
+    assert une(trozos, seps) == texto
+    assert parte_texto(texto, 0) == ([texto], [])
+    # sin espacios: corte duro, pero nunca dentro de una marca
+    assert parte_texto("abcdefgh⟦12⟧ij", 10)[0] == ["abcdefgh", "⟦12⟧ij"]
+
+    falso = BackendFalso()
+    guardado = (traduce.BACKENDS_ACTIVOS, traduce.TOPE_PETICION)
+    traduce.BACKENDS_ACTIVOS, traduce.TOPE_PETICION = {"es": falso}, 25
+    try:
+        largo = "One two three.\nFour five six. Seven."
+        assert traduce._envia([largo, "tiny"], "es") == [largo.upper(), "TINY"]
+        assert falso.llamadas == 1  # trozos y cue corto en la misma petición
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.TOPE_PETICION = guardado
+
+    # tres "workers" con un texto cada uno → un solo paquete
+    enviados = []
+
+    def envia(textos):
+        enviados.append(list(textos))
+        return [t.upper() for t in textos]
+
+    emp = Empaquetador(envia, max_chars=1000, productores=3, espera=5)
+    resultados = {}
+    hilos = [
+        threading.Thread(target=lambda t=t: resultados.update({t: emp.traduce([t])}))
+        for t in ("a", "b", "c")
+    ]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join(timeout=2)
+    assert resultados == {"a": ["A"], "b": ["B"], "c": ["C"]}
+    assert len(enviados) == 1 and sorted(enviados[0]) == ["a", "b", "c"]
+    print("✅ PASS\n")
+
+
+def test_arranque_perezoso():
+    print("Test: importar traduce no lee argv ni carga el cliente de red")
+    codigo = (
+        "import sys; sys.argv = ['x', '--opcion-que-no-existe']; import traduce; "
+        "pesados = {'argparse', 'tqdm', 'deep_translator', 'asyncio', 'sqlite3'}; "
+        "print(sorted(pesados & set(sys.modules)))"
+    )
+    proceso = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=Path(__file__).parent,
+        capture_output=True,
+        text=True,
+    )
+    assert proceso.returncode == 0, proceso.stderr
+    assert proceso.stdout.strip() == "[]"
+
+    args = traduce.crea_parser().parse_args(["--targets", "es,pt", "--workers", "3"])
+    assert args.targets == "es,pt" and args.workers == 3 and not args.use_dict
+    print("✅ PASS\n")
+
+
+def test_plan():
+    print("Test: --plan estima cues, caracteres y peticiones sin traducir nada")
+    tmp = Path("test_plan_tmp")
+    (tmp / "a").mkdir(parents=True, exist_ok=True)
+    cue = "1\n00:00:01,000 --> 00:00:02,000\n{}\n"
+    (tmp / "a" / "uno.srt").write_text(cue.format("Hello there."), encoding="utf-8")
+    (tmp / "a" / "dos.srt").write_text(cue.format("Hello there."), encoding="utf-8")
+    (tmp / "b").mkdir(exist_ok=True)
+    (tmp / "b" / "tres.srt").write_text(cue.format("A new i64 line."), encoding="utf-8")
+    guardado = (traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE)
+    traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE = {}, False
+    try:
+        plan = traduce.planifica(tmp)
+        assert plan["carpetas"]["a"]["cues"] == 2
+        assert plan["carpetas"]["a"]["unicos"] == 1  # el duplicado no cuenta
+        total = plan["total"]
+        assert (total["archivos"], total["cues"], total["unicos"]) == (3, 3, 2)
+        assert total["caracteres"] == len("Hello there.") + len("A new ⟦0⟧ line.")
+        assert total["peticiones"] == 2 and plan["segundos"] > 0
+        assert not traduce.BACKENDS_ACTIVOS  # ni una petición
+        assert not (tmp / "a" / "esp").exists()  # ni un archivo escrito
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE = guardado
+        shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_preparado_en_proceso():
+    print("Test: --procs, archivo leído y protegido fuera y traducido aquí")
+    cue = Cue("7", 1000, 2500, ["Use", "i64 here."], "align:start", False)
+    for elemento in (cue, Bloque(["NOTE", "hola"])):
+        assert repr(de_tupla(a_tupla(elemento))) == repr(elemento)
+
+    tmp = Path("test_procs_tmp")
+    tmp.mkdir(exist_ok=True)
+    origen = tmp / "clase.vtt"
+    origen.write_text(
+        "WEBVTT\n\nNOTE nada\n\n00:01.000 --> 00:02.000\nUse i64 here.\n\n"
+        "00:02.000 --> 00:03.000\nPlain cue.\n",
+        encoding="utf-8",
+    )
+    elementos, protegidos = traduce.prepara(origen)
+    assert protegidos == [("Use ⟦0⟧ here.", ("i64",)), None]
+    preparado = Future()
+    preparado.set_result((elementos, protegidos))
+    guardado = (traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE)
+    traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE = {"es": BackendFalso()}, False
+    try:
+        (salida,) = traduce.traduce_archivo(origen, False, preparado)
+        texto = salida.read_text(encoding="utf-8")
+        assert "NOTE nada" in texto and "00:01.000 --> 00:02.000" in texto
+        assert "USE i64 HERE." in texto and "PLAIN CUE." in texto
+        assert not traduce.necesita_traduccion(origen)
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE = guardado
+        shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_frases():
+    print("Test: cues de una misma frase se traducen juntos y se reparten")
+    cues = [
+        Cue(None, 0, 1000, ["Let's name it Brown and"]),
+        Cue(None, 1000, 2000, ["it will contain colors."]),
+        Cue(None, 2000, 3000, ["Dot brown."]),
+        Cue(None, 3000, 4000, ["no period"]),
+        Cue(None, 9000, 9500, ["after a pause"]),
+    ]
+    assert agrupa_frases(cues, 4500) == [[0, 1], [2], [3], [4]]
+    assert agrupa_frases(cues, 30) == [[0], [1], [2], [3], [4]]  # no cabe
+    assert reparte("uno dos tres cuatro", [3, 1]) == ["uno dos tres", "cuatro"]
+    assert reparte("solo", [1, 1]) is None
+    assert equilibra_lineas("uno dos tres cuatro", 2) == "uno dos\ntres cuatro"
+    unida = concatena(
+        [Protegido("usa ⟦0⟧\ny", ("i64",)), Protegido("⟦0⟧ también.", ("u8",))]
+    )
+    assert unida == Protegido("usa ⟦0⟧ y ⟦1⟧ también.", ("i64", "u8"))
+
+    tmp = Path("test_frases_tmp")
+    tmp.mkdir(exist_ok=True)
+    origen = tmp / "clase.srt"
+    origen.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nSo we pass an i64 and\nthen we\n\n"
+        "2\n00:00:02,000 --> 00:00:04,000\nget a u8 back.\n",
+        encoding="utf-8",
+    )
+    falso = BackendFalso()
+    guardado = (traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE, traduce.METRICAS)
+    traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE = {"es": falso}, False
+    traduce.METRICAS = Metricas()
+    previas = dict(traduce.ESTADISTICAS)
+    try:
+        (salida,) = traduce.traduce_archivo(origen, barra=False)
+        texto = salida.read_text(encoding="utf-8")
+        assert falso.llamadas == 1  # una sola petición para los dos cues
+        # dos cues, pero un solo texto a traducir
+        assert traduce.ESTADISTICAS["cues"] - previas["cues"] == 2
+        assert traduce.ESTADISTICAS["textos"] - previas["textos"] == 1
+        # sin barra (--workers > 1) las métricas también cuentan los cues
+        assert traduce.METRICAS.archivos[str(origen)]["cues"] == 2
+        assert (
+            "00:00:01,000 --> 00:00:02,000\nSO WE PASS AN\ni64 AND THEN WE\n" in texto
+        )
+        assert "00:00:02,000 --> 00:00:04,000\nGET A u8 BACK.\n" in texto
+
+        # los procesos de --plan/--procs agrupan con el tope de la ejecución
+        tope = traduce.TOPE_PETICION
+        assert len(traduce._analiza(origen)) == 1
+        traduce._inicia_proceso(False, True, [], 20)
+        try:
+            assert len(traduce._analiza(origen)) == 2
+        finally:
+            traduce._inicia_proceso(False, True, [], tope)
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE, traduce.METRICAS = guardado
+        shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_glosario():
+    print("Test: glosarios por dominio con traducción fija (--domains)")
+    prot = Protector(
+        {"git"},
+        TIPOS_DATO,
+        {"pullback": {"es": "retroceso"}, "pull request": {"es": "pull request"}},
+    )
+    # el glosario y el diccionario van en la misma pasada y al traductor sólo
+    # le llegan marcas
+    p = prot.protege("A Pullback after the pull request in git")
+    assert p == Protegido(
+        "A ⟦0⟧ after the ⟦1⟧ in ⟦2⟧", ("Pullback", "pull request", "git")
+    )
+    assert prot.en_idioma(p.originales, "es") == ("Retroceso", "pull request", "git")
+    assert prot.en_idioma(p.originales, "pt") == p.originales  # sin traducción
+    assert Protector(PALABRAS).en_idioma(("pullback",), "es") == ("pullback",)
+
+    # los dominios elegidos se compilan en un solo Protector
+    prot = traduce.compila_protector(False, ["trading"])
+    assert "pullback" in prot.terminos and "scaffold" not in prot.terminos
+    assert prot.protege("fibonacci levels") == ("⟦0⟧ levels", ("fibonacci",))
+    try:
+        traduce.compila_protector(False, ["astrologia"])
+        assert False, "dominio desconocido aceptado"
+    except SystemExit:
+        pass
+
+    guardado = (traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE, traduce.PROTECTOR)
+    traduce.BACKENDS_ACTIVOS = {"es": BackendFalso(), "pt": BackendFalso()}
+    traduce.USAR_CACHE, traduce.PROTECTOR = False, prot
+    try:
+        texto = ["Wait for the pullback near support."]
+        assert traduce.traduce_textos(texto, "es", barra=False) == [
+            "WAIT FOR THE retroceso NEAR soporte."
+        ]
+        assert traduce.traduce_textos(texto, "pt", barra=False) == [
+            "WAIT FOR THE pullback NEAR suporte."
+        ]
+    finally:
+        traduce.BACKENDS_ACTIVOS, traduce.USAR_CACHE, traduce.PROTECTOR = guardado
+    print("✅ PASS\n")
+
+
+def test_interrupcion():
+    print("Test: Ctrl-C cancela los archivos encolados en lugar de traducirlos")
+    tmp = Path("test_interrupcion_tmp").resolve()
+    tmp.mkdir(exist_ok=True)
+    for i in range(20):
+        (tmp / f"c{i:02}.srt").write_text(
+            "1\n00:00:01,000 --> 00:00:02,000\nHello.\n", encoding="utf-8"
+        )
+    codigo = (
+        "import time, traduce\n"
+        "llamadas = []\n"
+        "def falso(ruta, barra=True, preparado=None):\n"
+        "    llamadas.append(ruta)\n"
+        "    time.sleep(0.05)\n"
+        "    if len(llamadas) == 3:\n"
+        "        raise KeyboardInterrupt\n"
+        "traduce.traduce_archivo = falso\n"
+        "try:\n"
+        f"    traduce.main(['--root', {str(tmp)!r}, '--backend', 'mock', '--no-cache'])\n"
+        "except KeyboardInterrupt:\n"
+        "    print('llamadas', len(llamadas))\n"
+    )
+    try:
+        proceso = subprocess.run(
+            [sys.executable, "-c", codigo],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+        )
+        assert proceso.returncode == 0, proceso.stderr
+        # como mucho, el archivo que el worker ya había tomado
+        ultima = proceso.stdout.strip().splitlines()[-1]
+        assert ultima in ("llamadas 3", "llamadas 4"), ultima
+    finally:
+        shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
+def test_main_repetido():
+    print("Test: main() se puede llamar varias veces en el mismo proceso")
+    tmp = Path("test_main_repetido_tmp").resolve()
+    (tmp / "curso").mkdir(parents=True, exist_ok=True)
+    (tmp / "curso" / "clase.srt").write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nHello there.\n", encoding="utf-8"
+    )
+    codigo = (
+        "import traduce\n"
+        f"base = ['--root', {str(tmp / 'curso')!r}, '--backend', 'mock',\n"
+        f"        '--cache-dir', {str(tmp / 'memoria')!r}, '--workers', '2']\n"
+        "traduce.main(base)\n"
+        "assert traduce.MEMORIA is None and not traduce.BACKENDS_ACTIVOS\n"
+        "traduce.main(base + ['--targets', 'es,pt'])\n"
+        "print('estadisticas', traduce.ESTADISTICAS['unicos'])\n"
+    )
+    try:
+        proceso = subprocess.run(
+            [sys.executable, "-c", codigo],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+        )
+        assert proceso.returncode == 0, proceso.stderr
+        # la segunda ejecución sólo cuenta lo suyo (el portugués)
+        assert proceso.stdout.strip().splitlines()[-1] == "estadisticas 1"
+        assert (tmp / "curso" / "por" / "clase_por.srt").is_file()
+    finally:
+        shutil.rmtree(tmp)
+    print("✅ PASS\n")
+
+
 # ---------- ejecutar ----------
 if __name__ == "__main__":
     test_nombre_traducido()
     test_tipos_dato()
     test_ya_esta_traducido()
     test_mover()
+    test_lotes()
+    test_escritor_atomico()
+    test_subtitulos_vtt_srt()
+    test_limitador()
+    test_memoria_traduccion()
+    test_duplicados()
+    test_traductor_async()
+    test_backend_mock()
+    test_protector()
+    test_restaura_marcas()
+    test_manifiesto()
+    test_registro_cues()
+    test_reanuda()
+    test_descubre()
+    test_varios_idiomas()
+    test_metricas()
+    test_bench_corpus()
+    test_reintentos()
+    test_cues_pendientes()
+    test_empaquetado()
+    test_arranque_perezoso()
+    test_plan()
+    test_preparado_en_proceso()
+    test_frases()
+    test_glosario()
+    test_interrupcion()
+    test_main_repetido()
     print("🎉 Todos los tests pasaron.")
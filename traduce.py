@@ -1,34 +1,90 @@
 #!/usr/bin/env python3
 """
-Traduce archivos .vtt/.srt de inglés a español.
+Traduce archivos .vtt/.srt de inglés a español (u otros idiomas con --targets).
 Flag: --use-dict  → protege palabras del diccionario + tipos de datos
        (sin flag) → solo protege tipos de datos (mejor fluidez)
+      --domains   → además, glosarios con traducciones fijas por dominio
 """
 
 from __future__ import annotations
 
+import os
 import re
-import time
 import shutil
-import argparse
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from deep_translator import GoogleTranslator
-from tqdm import tqdm
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from backends import BACKENDS, Backend, crea_backend
+from empaquetador import parte_texto, une
+from frases import agrupa_frases, equilibra_lineas, reparte
+from limitador import LimitadorTasa
+from manifiesto import (
+    AL_DIA,
+    CAMBIADO,
+    NUEVO,
+    EscritorRegistro,
+    guarda_manifiestos,
+    lee_parcial,
+    lee_registro,
+    manifiesto_de,
+    ruta_registro,
+)
+from metricas import FASES, Metricas
+from proteccion import Protector, Protegido, concatena
+from proteccion import repara as repara_marcas
+from proteccion import restaura as restaura_marcas
+from proteccion import sustituye as sustituye_marcas
+from reintentos import Interruptor, PoliticaReintentos, es_reintentable
+from subtitulos import (
+    Cue,
+    Elemento,
+    EscritorAtomico,
+    EscritorSubtitulos,
+    a_tupla,
+    de_tupla,
+    formato_de,
+    lee_subtitulos,
+)
+
+# tqdm, concurrent.futures, sqlite3 y argparse se importan donde se usan: así
+# importar este módulo (pruebas, herramientas que sólo quieren
+# nombre_traducido o TIPOS_DATO) es casi instantáneo
+if TYPE_CHECKING:
+    import argparse
+    from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+    from empaquetador import Empaquetador
+    from memoria_traduccion import MemoriaTraduccion
 
 # ------------------ configuración ------------------
-TRAD_SUFIJO = "_esp"
 SUB_DIR_EN = "en"
 SUB_DIR_ES = "esp"
-DELAY = 0.4
+# carpeta de salida (y sufijo: _esp, _por...) de cada idioma; si no está aquí
+# se usa el propio código de idioma
+CARPETAS_IDIOMA = {"es": SUB_DIR_ES, "pt": "por", "fr": "fra", "de": "deu", "it": "ita"}
+RPS = 2.5  # peticiones por segundo al traductor (antes: pausa fija de 0.4 s)
+RAFAGA = 1
 ENCODING = "utf-8"
+EXTENSIONES = (".vtt", ".srt")
+SUFIJOS_EN = (".en", "_en", "-en", "en_US")  # originales que se mueven a en/
+ORIGEN = "en"
+DESTINO = "es"
+CACHE_DIR = Path.home() / ".cache" / "traduce-subtitulos"
+CACHE_MAX = 500_000  # entradas en la memoria de traducción
+LOTE_MAX_CHARS = 4500  # Google gratuito corta en ~5000 caracteres por petición
+ESPERA_EMPAQUETADO = 0.05  # s que se espera a otros workers para llenar un paquete
 
-# regex time-codes VTT/SRT
-RE_META = re.compile(
-    r"(?:^\s*$|"
-    r"^\d+$|"
-    r"^\d{2}:\d{2}:\d{2}[,.]\d{3}\s-->\s\d{2}:\d{2}:\d{2}[,.]\d{3}$)",
-    re.MULTILINE,
-)
+# separador numerado entre cues de un mismo lote; se tolera que el traductor
+# meta espacios o saltos de línea alrededor
+SEP_LOTE = "\n@@{}@@\n"
+RE_SEP_LOTE = re.compile(r"\s*@\s?@\s*(\d+)\s*@\s?@\s*")
 
 # Regex para tipos de datos con números / genéricos
 # Ej: i64, f32, Vec<T>, Option<T>, [T; N], fn(T)->U
@@ -38,21 +94,180 @@ TIPOS_DATO = re.compile(
     r"\[.*?\]|"  # [T; N]
     r"fn\([^)]*\)->[^,;.\s]+"  # fn(T)->U
 )
-tr = GoogleTranslator(source="en", target="es")
 
 # --------------------------------------------------
-# FLAG: --use-dict
-parser = argparse.ArgumentParser(
-    description="Traduce subtítulos .vtt/.srt de inglés a español."
-)
-parser.add_argument(
-    "--use-dict",
-    action="store_true",
-    help="Usa diccionario de palabras reservadas además de tipos de datos",
-)
-args = parser.parse_args()
-USAR_DICT = args.use_dict
-# --------------------------------------------------
+
+
+def crea_parser() -> argparse.ArgumentParser:
+    """Opciones de la línea de comandos (ver configura())."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Traduce subtítulos .vtt/.srt de inglés a español."
+    )
+    parser.add_argument(
+        "--use-dict",
+        action="store_true",
+        help="Usa diccionario de palabras reservadas además de tipos de datos",
+    )
+    parser.add_argument(
+        "--domains",
+        default="",
+        metavar="D1,D2",
+        help="Glosarios a aplicar (cyber, python, trading, git): sus términos "
+        "tienen traducción fija y sus palabras reservadas no se traducen",
+    )
+    parser.add_argument(
+        "--batch-chars",
+        type=int,
+        default=LOTE_MAX_CHARS,
+        metavar="N",
+        help="Agrupa cues en peticiones de hasta N caracteres (0 = una petición por cue)",
+    )
+    parser.add_argument(
+        "--no-merge",
+        action="store_true",
+        help="Traduce cada cue por separado, sin unir en una frase los cues "
+        "que la parten",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Traduce hasta N archivos a la vez (por defecto 1)",
+    )
+    parser.add_argument(
+        "--procs",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Lee y protege los archivos en N procesos aparte y los hilos de "
+        "--workers sólo traducen (por defecto 0: todo en los hilos)",
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=RPS,
+        help=f"Peticiones por segundo permitidas al traductor (por defecto {RPS})",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=RAFAGA,
+        metavar="N",
+        help="Peticiones que se pueden lanzar seguidas tras un rato inactivo",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=CACHE_DIR,
+        help=f"Carpeta de la memoria de traducción (por defecto {CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--cache-max",
+        type=int,
+        default=CACHE_MAX,
+        metavar="N",
+        help="Máximo de entradas en la memoria; se descartan las menos usadas",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No consulta ni guarda la memoria de traducción",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default="google",
+        help="Motor de traducción: google (deep-translator), google-async "
+        "(cliente asyncio) o mock (sin red, para medir el pipeline)",
+    )
+    parser.add_argument(
+        "--in-flight",
+        type=int,
+        default=4,
+        metavar="N",
+        help="Peticiones simultáneas del backend google-async (por defecto 4)",
+    )
+    parser.add_argument(
+        "--mock-latency",
+        type=float,
+        default=0.0,
+        metavar="SEG",
+        help="Latencia simulada por petición del backend mock",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Si un original cambió, retraduce sólo los cues nuevos o editados",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=4,
+        help="Reintentos de cada petición ante errores pasajeros (red, 429, 5xx), "
+        "con espera exponencial al azar (por defecto 4)",
+    )
+    parser.add_argument(
+        "--breaker-threshold",
+        type=int,
+        default=5,
+        help="Errores 429 seguidos que pausan a todos los workers (por defecto 5)",
+    )
+    parser.add_argument(
+        "--breaker-pause",
+        type=float,
+        default=30.0,
+        help="Segundos de pausa cuando el traductor está limitando; se duplica si "
+        "sigue limitando (por defecto 30)",
+    )
+    parser.add_argument(
+        "--retry-passes",
+        type=int,
+        default=1,
+        help="Pasadas extra, al final, para los archivos con cues que no se "
+        "pudieron traducir (por defecto 1)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Retoma una ejecución cortada: reutiliza los cues que ya se habían "
+        "traducido de los archivos que quedaron a medias",
+    )
+    parser.add_argument(
+        "--targets",
+        default=DESTINO,
+        metavar="es,pt,fr",
+        help="Idiomas de destino separados por comas; cada archivo se lee y "
+        "protege una sola vez para todos (por defecto es)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="RESUMEN.json",
+        help="Al terminar, guarda un resumen JSON de la ejecución (latencias "
+        "p50/p95/p99, peticiones/s, aciertos de la memoria, tiempos por archivo); "
+        "'-' lo imprime",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="TRAZA.jsonl",
+        help="Guarda una línea JSON por cada petición al traductor",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="No traduce nada: estima archivos, cues, caracteres, peticiones y "
+        "tiempo por carpeta con las opciones dadas (sin red)",
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=Path.cwd(),
+        help="Carpeta donde buscar subtítulos (por defecto, la actual)",
+    )
+    return parser
 
 
 def cargar_diccionario() -> set[str]:
@@ -64,41 +279,520 @@ def cargar_diccionario() -> set[str]:
         return set()
 
 
-def traduce_bloque(texto: str) -> str:
-    if not texto.strip():
-        return texto
+def cargar_dominios() -> dict[str, tuple[set[str], dict[str, dict[str, str]]]]:
+    try:
+        from diccionario_no_traducir import DOMINIOS
+
+        return DOMINIOS
+    except ImportError:
+        return {}
+
+
+def compila_protector(usar_dict: bool, dominios: list[str]) -> Protector:
+    """Diccionario (con --use-dict) y glosarios de `dominios` compilados en un
+    solo Protector; sale con SystemExit si algún dominio no existe."""
+    if not usar_dict and not dominios:
+        return Protector((), TIPOS_DATO)
+    palabras = set(cargar_diccionario()) if usar_dict else set()
+    terminos: dict[str, dict[str, str]] = {}
+    tablas = cargar_dominios()
+    for dominio in dominios:
+        if dominio not in tablas:
+            raise SystemExit(
+                f"Dominio desconocido: {dominio} "
+                f"(disponibles: {', '.join(tablas) or 'ninguno'})"
+            )
+        reservadas, glosario = tablas[dominio]
+        palabras |= reservadas
+        terminos.update(glosario)
+    return Protector(palabras, TIPOS_DATO, terminos)
+
+
+# sin --use-dict sólo se protegen los tipos de datos (ver configura())
+PROTECTOR = Protector((), TIPOS_DATO)
+
+
+# ------------- estado de la ejecución -------------
+# Valores por defecto; main() los sustituye por los de la línea de comandos
+# (ver configura()). Importar este módulo no lee sys.argv ni construye
+# backends, ni abre la memoria de traducción: cada cosa se crea la primera vez
+# que hace falta.
+USAR_DICT = False
+DOMINIOS: list[str] = []
+DESTINOS = [DESTINO]
+RAIZ = Path.cwd()
+NOMBRE_BACKEND = "google"
+MAX_CHARS_LOTE = LOTE_MAX_CHARS
+EN_VUELO = 4
+LATENCIA_MOCK = 0.0
+WORKERS = 1
+PROCESOS = 0
+UNIR_FRASES = True
+INCREMENTAL = False
+REANUDA = False
+SALIDA_METRICAS: str | None = None
+METRICAS = Metricas()
+# compartido por todos los hilos: es lo único que decide el ritmo de peticiones
+LIMITADOR = LimitadorTasa(RPS, RAFAGA)
+REINTENTOS = PoliticaReintentos()
+# también compartido: si el traductor limita, se pausa a todos a la vez
+INTERRUPTOR = Interruptor()
+PASADAS_REINTENTO = 1
+USAR_CACHE = True
+# un backend por idioma de destino, construido la primera vez que hace falta
+# (ver backend()); todos comparten LIMITADOR
+BACKENDS_ACTIVOS: dict[str, Backend] = {}
+_lock_backend = threading.Lock()
+# reparte cada ventana de cues entre los idiomas de destino a la vez (ver
+# pool_idiomas())
+_POOL_IDIOMAS: ThreadPoolExecutor | None = None
+# con varios workers, junta lo pendiente de todos en peticiones llenas (ver
+# empaquetador())
+_EMPAQUETADORES: dict[str, Empaquetador] = {}
+MEMORIA: MemoriaTraduccion | None = None
+_lock_memoria = threading.Lock()
+
+# traducciones ya resueltas en esta ejecución ((idioma, protegido) → traducción)
+_memo: dict[tuple[str, str], str] = {}
+_en_curso: dict[tuple[str, str], threading.Event] = {}
+_lock_memo = threading.Lock()
+ESTADISTICAS = {
+    "cues": 0,  # cues enviados a traducir (por idioma)
+    "textos": 0,  # lo que se tradujo: frases o cues sueltos (por idioma)
+    "unicos": 0,  # ... sin contar los repetidos
+    "reutilizados": 0,
+    "marcas_reparadas": 0,
+    "partidos": 0,
+    "frases": 0,
+    "cues_unidos": 0,
+}
+# archivos con cues que fallaron: no se dan por traducidos y se repiten en la
+# pasada de reintento del final (o en la próxima ejecución)
+PENDIENTES: list[Path] = []
+
+
+def _deriva() -> None:
+    """Recalcula lo que depende de las opciones."""
+    global MODO, MAX_CHARS_LOTE, TOPE_PETICION, VENTANA_CHARS, MODO_CACHE, FIRMA
+    global CARPETAS_SALIDA
+    MODO = "dict+types" if USAR_DICT else "types-only"
+    if DOMINIOS:
+        MODO += "+" + ",".join(DOMINIOS)
+    MAX_CHARS_LOTE = min(MAX_CHARS_LOTE, BACKENDS[NOMBRE_BACKEND].max_chars)
+    # un cue más largo que esto se parte por frases (aunque --batch-chars sea 0)
+    TOPE_PETICION = MAX_CHARS_LOTE if MAX_CHARS_LOTE > 0 else LOTE_MAX_CHARS
+    # caracteres de texto que se leen de un archivo antes de mandarlos a
+    # traducir: lo justo para llenar las peticiones que el backend puede tener
+    # en vuelo
+    VENTANA_CHARS = max(MAX_CHARS_LOTE, 1000) * EN_VUELO
+    # la memoria de traducción separa también por motor: lo que devuelve el
+    # mock nunca debe servirse como traducción real
+    MODO_CACHE = f"{MODO}@{BACKENDS[NOMBRE_BACKEND].motor}"
+    # si cambia el motor o el modo de protección, el manifiesto obliga a
+    # retraducir
+    FIRMA = {"backend": BACKENDS[NOMBRE_BACKEND].motor, "modo": MODO}
+    if PROTECTOR.terminos:
+        # las traducciones fijas se aplican después de la memoria de
+        # traducción: si se corrige una, sólo el manifiesto se entera
+        import hashlib
+
+        glosario = json.dumps(PROTECTOR.terminos, sort_keys=True, ensure_ascii=False)
+        FIRMA["glosario"] = hashlib.sha1(glosario.encode()).hexdigest()[:12]
+    # las carpetas de salida conocidas se podan aunque no estén en --targets,
+    # para no tomar por originales las traducciones de una ejecución anterior
+    CARPETAS_SALIDA = {
+        SUB_DIR_EN,
+        *CARPETAS_IDIOMA.values(),
+        *(CARPETAS_IDIOMA.get(d, d) for d in DESTINOS),
+    }
+
+
+_deriva()
+
+
+def configura(args: argparse.Namespace) -> None:
+    """Aplica las opciones de la línea de comandos (ver crea_parser())."""
+    global USAR_DICT, DESTINOS, RAIZ, NOMBRE_BACKEND, MAX_CHARS_LOTE, EN_VUELO
+    global LATENCIA_MOCK, WORKERS, PROCESOS, UNIR_FRASES, INCREMENTAL, REANUDA, SALIDA_METRICAS
+    global METRICAS, LIMITADOR, REINTENTOS, INTERRUPTOR, PASADAS_REINTENTO, DOMINIOS
+    global USAR_CACHE, CACHE_DIR, CACHE_MAX, PROTECTOR, _POOL_IDIOMAS
+    USAR_DICT = args.use_dict
+    DOMINIOS = sorted({d.strip() for d in args.domains.split(",") if d.strip()})
+    DESTINOS = list(
+        dict.fromkeys(t.strip() for t in args.targets.split(",") if t.strip())
+    )
+    RAIZ = args.root
+    NOMBRE_BACKEND = args.backend
+    MAX_CHARS_LOTE = args.batch_chars
+    EN_VUELO = max(1, args.in_flight)
+    LATENCIA_MOCK = args.mock_latency
+    WORKERS = max(1, args.workers)
+    PROCESOS = max(0, args.procs)
+    UNIR_FRASES = not args.no_merge
+    INCREMENTAL = args.incremental
+    REANUDA = args.resume
+    SALIDA_METRICAS = args.metrics
+    METRICAS = Metricas(args.trace)
+    LIMITADOR = LimitadorTasa(args.rps, args.burst)
+    REINTENTOS = PoliticaReintentos(args.retries)
+    INTERRUPTOR = Interruptor(args.breaker_threshold, args.breaker_pause)
+    PASADAS_REINTENTO = max(0, args.retry_passes)
+    USAR_CACHE = not args.no_cache
+    CACHE_DIR = args.cache_dir
+    CACHE_MAX = args.cache_max
+    # el diccionario y los glosarios se compilan una sola vez; sin --use-dict
+    # ni --domains sólo se protegen los tipos de datos
+    PROTECTOR = compila_protector(USAR_DICT, DOMINIOS)
+    # lo que quede de una ejecución anterior en el mismo proceso (main()
+    # llamado como librería): los backends y empaquetadores se construyeron
+    # con el limitador, las métricas y los reintentos de entonces
+    cierra_recursos()
+    for emp in _EMPAQUETADORES.values():
+        emp.cierra()
+    _EMPAQUETADORES.clear()
+    if _POOL_IDIOMAS is not None:
+        _POOL_IDIOMAS.shutdown()
+    _POOL_IDIOMAS = None
+    _memo.clear()
+    PENDIENTES.clear()
+    ESTADISTICAS.update(dict.fromkeys(ESTADISTICAS, 0))
+    _deriva()
+
+
+def cierra_recursos() -> None:
+    """Cierra la memoria de traducción y los backends; se vuelven a abrir la
+    próxima vez que hagan falta."""
+    global MEMORIA
+    if MEMORIA is not None:
+        MEMORIA.cierra()
+        MEMORIA = None
+    for b in BACKENDS_ACTIVOS.values():
+        b.cierra()
+    BACKENDS_ACTIVOS.clear()
+
+
+def protege(texto: str) -> Protegido:
+    """Tipos de datos (y, con --use-dict, palabras del diccionario) → ⟦N⟧."""
+    return PROTECTOR.protege(texto)
+
+
+def restaura(
+    protegido: Protegido, trad: str | None, original: str, idioma: str = DESTINO
+) -> str:
+    """Vuelve a poner lo protegido en la traducción (los términos del glosario,
+    en `idioma`); si falló, el original."""
+    if trad is None:
+        return original
+    originales = PROTECTOR.en_idioma(protegido.originales, idioma)
+    texto, reparadas = restaura_marcas(trad, originales)
+    if reparadas:
+        with _lock_memo:
+            ESTADISTICAS["marcas_reparadas"] += reparadas
+    return texto
+
 
-    # 1) Reservar tipos de datos
-    def _reservar(match: re.Match) -> str:
-        return f"{{{{{match.group(0)}}}}}"
+def backend(idioma: str = DESTINO) -> Backend:
+    """El backend de `idioma`; se construye (y se comprueba que soporta el
+    idioma) la primera vez que hace falta traducir algo: una ejecución que
+    sale entera de la memoria de traducción no carga el cliente de red."""
+    with _lock_backend:
+        if idioma not in BACKENDS_ACTIVOS:
+            nuevo = crea_backend(
+                NOMBRE_BACKEND,
+                ORIGEN,
+                idioma,
+                LIMITADOR,
+                metricas=METRICAS,
+                reintentos=REINTENTOS,
+                interruptor=INTERRUPTOR,
+                en_vuelo=EN_VUELO,
+                latencia=LATENCIA_MOCK,
+            )
+            soportados = nuevo.idiomas()
+            if soportados is not None and idioma not in soportados:
+                raise SystemExit(
+                    f"El backend {NOMBRE_BACKEND} no soporta el idioma {idioma}"
+                )
+            BACKENDS_ACTIVOS[idioma] = nuevo
+        return BACKENDS_ACTIVOS[idioma]
 
-    protegido = TIPOS_DATO.sub(_reservar, texto)
 
-    # 2) Si se usó --use-dict, proteger palabras sueltas
-    if USAR_DICT:
-        palabras = cargar_diccionario()
-        tokens = re.findall(r"[A-Za-z][A-Za-z0-9_]*|[^A-Za-z0-9_]+", protegido)
-        aux = []
-        for tok in tokens:
-            lower = tok.lower()
-            if lower in palabras:
-                aux.append(f"{{{{{tok}}}}}")
+def pool_idiomas() -> ThreadPoolExecutor:
+    """Hilos que reparten cada ventana de cues entre los idiomas de destino."""
+    global _POOL_IDIOMAS
+    with _lock_backend:
+        if _POOL_IDIOMAS is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _POOL_IDIOMAS = ThreadPoolExecutor(max_workers=len(DESTINOS) * WORKERS)
+        return _POOL_IDIOMAS
+
+
+def _pide_varias(protegidos: list[str], idioma: str) -> list[str | Exception]:
+    """Una petición por texto; los errores se devuelven en su posición."""
+    return backend(idioma).translate_batch(protegidos)
+
+
+def arma_lotes(textos: list[str], max_chars: int) -> list[list[int]]:
+    """Agrupa índices de `textos` consecutivos sin pasar de `max_chars`."""
+    lotes: list[list[int]] = []
+    actual: list[int] = []
+    largo = 0
+    for i, texto in enumerate(textos):
+        costo = len(texto) + len(SEP_LOTE.format(i))
+        if actual and (max_chars <= 0 or largo + costo > max_chars):
+            lotes.append(actual)
+            actual, largo = [], 0
+        actual.append(i)
+        largo += costo
+    if actual:
+        lotes.append(actual)
+    return lotes
+
+
+def separa_lote(trad: str, n: int) -> list[str] | None:
+    """Parte la traducción de un lote; None si los separadores no cuadran."""
+    partes = RE_SEP_LOTE.split(trad)
+    # partes = [antes, idx0, txt0, idx1, txt1, ...]
+    if partes[0].strip() or len(partes) != 2 * n + 1:
+        return None
+    if [int(i) for i in partes[1::2]] != list(range(n)):
+        return None
+    return [t.strip() for t in partes[2::2]]
+
+
+def traduce_lotes(
+    lotes: list[list[str]], idioma: str = DESTINO
+) -> list[list[str | None]]:
+    """Traduce cada lote de cues ya protegidos en una sola petición.
+
+    Los lotes cuyos separadores no sobreviven (o que el traductor rechaza
+    por su contenido) se repiten cue a cue; None = fallido. Si el error es
+    pasajero (429, 5xx, red) el backend ya agotó sus reintentos: repetir cada
+    cue por separado sólo multiplicaría las peticiones, así que el lote queda
+    para la pasada de reintento del final (o la próxima ejecución).
+    """
+    unidos = [
+        (
+            "".join(SEP_LOTE.format(i) + p for i, p in enumerate(lote)).strip()
+            if len(lote) > 1
+            else lote[0]
+        )
+        for lote in lotes
+    ]
+    salida: list[list[str | None]] = []
+    sueltos: list[tuple[int, int]] = []  # (lote, cue) a repetir de uno en uno
+    for n, (lote, trad) in enumerate(zip(lotes, _pide_varias(unidos, idioma))):
+        if isinstance(trad, Exception) and es_reintentable(trad):
+            print(f"      ░ lote fallido ({len(lote)} cues, se reintentará): {trad}")
+            salida.append([None] * len(lote))
+            continue
+        if isinstance(trad, Exception):
+            print(f"      ░ lote fallido ({len(lote)} cues): {trad}")
+            partes, motivo = None, "lote fallido"
+        else:
+            partes = [trad] if len(lote) == 1 else separa_lote(trad, len(lote))
+            motivo = "separadores perdidos"
+        if partes is None:
+            partes = [None] * len(lote)
+            if len(lote) > 1:
+                sueltos.extend((n, i) for i in range(len(lote)))
+                METRICAS.reintento(motivo, len(lote))
+        salida.append(partes)
+
+    if sueltos:
+        repetidos = _pide_varias([lotes[n][i] for n, i in sueltos], idioma)
+        for (n, i), trad in zip(sueltos, repetidos):
+            if isinstance(trad, Exception):
+                print(f"      ░ traducción fallida: {trad}")
             else:
-                aux.append(tok)
-        protegido = "".join(aux)
+                salida[n][i] = trad
+    return salida
+
+
+def memoria() -> MemoriaTraduccion | None:
+    """Abre la memoria de traducción la primera vez que se necesita."""
+    global MEMORIA
+    if MEMORIA is None and USAR_CACHE:
+        with _lock_memoria:
+            if MEMORIA is None:
+                from memoria_traduccion import MemoriaTraduccion
+
+                MEMORIA = MemoriaTraduccion(CACHE_DIR, CACHE_MAX)
+    return MEMORIA
+
+
+def _traduce_unicos(
+    protegidos: list[str],
+    idioma: str,
+    barra: bool,
+    avisa: Callable[[str, str], None] | None = None,
+) -> list[str | None]:
+    mem = memoria()
+
+    # 1) Lo que no tiene letras (sólo marcas, números, ♪...) no se traduce, y
+    #    lo que ya está en la memoria de traducción no sale a la red
+    traducidos: list[str | None] = [
+        None if any(c.isalpha() for c in p) else p for p in protegidos
+    ]
+    consultas = [i for i, t in enumerate(traducidos) if t is None]
+    if mem is not None:
+        for i in consultas:
+            traducidos[i] = mem.obtiene(protegidos[i], ORIGEN, idioma, MODO_CACHE)
+    pendientes = [i for i in consultas if traducidos[i] is None]
+    if mem is not None:
+        METRICAS.cache(len(consultas) - len(pendientes), len(pendientes))
+
+    # 2) El resto, empaquetado en peticiones llenas (con varios workers, junto
+    #    con lo pendiente de otros archivos); sólo se memorizan las
+    #    traducciones correctas
+    textos = [protegidos[i] for i in pendientes]
+    if textos:
+        llega = None if avisa is None else lambda j, trad: avisa(textos[j], trad)
+        emp = empaquetador(idioma)
+        if emp:
+            trads = emp.traduce(textos, llega)
+        else:
+            trads = _envia(textos, idioma, barra, llega)
+        for i, trad in zip(pendientes, trads):
+            traducidos[i] = trad
+            if trad is not None and mem is not None:
+                mem.guarda(protegidos[i], ORIGEN, idioma, MODO_CACHE, trad)
+    return traducidos
+
+
+def _envia(
+    textos: list[str],
+    idioma: str,
+    barra: bool = False,
+    avisa: Callable[[int, str], None] | None = None,
+) -> list[str | None]:
+    """Traduce `textos` en peticiones de hasta MAX_CHARS_LOTE caracteres.
+
+    Los que no caben en una petición se parten por frases y se vuelven a unir
+    después; si falla un trozo, el texto entero queda sin traducir (None).
+    Si el backend es concurrente se despachan --in-flight lotes a la vez.
+    `avisa(i, traduccion)` se llama en cuanto está traducido cada texto.
+    """
+    from tqdm import tqdm
+
+    piezas: list[str] = []
+    partes: list[tuple[int, int, list[str]]] = []  # (inicio, nº trozos, seps)
+    for texto in textos:
+        trozos, separadores = parte_texto(texto, TOPE_PETICION)
+        partes.append((len(piezas), len(trozos), separadores))
+        piezas.extend(trozos)
+
+    trads: list[str | None] = [None] * len(piezas)
+    listos = 0  # textos cuyos trozos ya volvieron todos
+    lotes = arma_lotes(piezas, MAX_CHARS_LOTE)
+    grupo = EN_VUELO if backend(idioma).concurrente else 1
+    for inicio in tqdm(
+        range(0, len(lotes), grupo), unit="lotes", leave=False, disable=not barra
+    ):
+        indices = lotes[inicio : inicio + grupo]
+        resultados = traduce_lotes(
+            [[piezas[i] for i in lote] for lote in indices], idioma
+        )
+        for lote, trads_lote in zip(indices, resultados):
+            for i, trad in zip(lote, trads_lote):
+                trads[i] = trad
+        if avisa is not None:
+            # los lotes van en orden: lo que acaba antes del último trozo
+            # enviado ya está completo
+            hechos = indices[-1][-1] + 1
+            while listos < len(partes) and sum(partes[listos][:2]) <= hechos:
+                primero, n, separadores = partes[listos]
+                trozos = trads[primero : primero + n]
+                if None not in trozos:
+                    avisa(listos, une(trozos, separadores))
+                listos += 1
+
+    salida: list[str | None] = []
+    for inicio, n, separadores in partes:
+        trozos = trads[inicio : inicio + n]
+        if n > 1 and None not in trozos:
+            with _lock_memo:
+                ESTADISTICAS["partidos"] += 1
+        salida.append(None if None in trozos else une(trozos, separadores))
+    return salida
+
+
+def empaquetador(idioma: str) -> Empaquetador | None:
+    """Con varios workers, el empaquetador compartido de `idioma`; si no, None
+    (un solo archivo a la vez ya llena sus peticiones con su ventana)."""
+    if WORKERS == 1 or MAX_CHARS_LOTE <= 0:
+        return None
+    with _lock_backend:
+        if idioma not in _EMPAQUETADORES:
+            from empaquetador import Empaquetador
+
+            grupo = EN_VUELO if BACKENDS[NOMBRE_BACKEND].concurrente else 1
+            _EMPAQUETADORES[idioma] = Empaquetador(
+                partial(_envia, idioma=idioma),
+                MAX_CHARS_LOTE * grupo,
+                productores=WORKERS,
+                espera=ESPERA_EMPAQUETADO,
+                hilos=WORKERS,
+            )
+        return _EMPAQUETADORES[idioma]
+
+
+def traduce_protegidos(
+    protegidos: list[str],
+    idioma: str = DESTINO,
+    barra: bool = True,
+    avisa: Callable[[str, str], None] | None = None,
+) -> list[str | None]:
+    """Traduce cada texto distinto una sola vez por idioma en toda la ejecución.
+    None = no se pudo traducir.
+
+    Si otro worker ya está traduciendo el mismo texto se espera su resultado
+    en lugar de pedirlo de nuevo. `avisa(texto, traduccion)` se llama con lo
+    que sale a la red en cuanto vuelve su petición (lo demás, sólo al final).
+    """
+    unicos = list(dict.fromkeys(protegidos))
 
-    # 3) Traducir bloque completo
+    propios: list[str] = []
+    ajenos: list[threading.Event] = []
+    with _lock_memo:
+        for p in unicos:
+            if (idioma, p) in _memo:
+                continue
+            if (idioma, p) in _en_curso:
+                ajenos.append(_en_curso[idioma, p])
+            else:
+                _en_curso[idioma, p] = threading.Event()
+                propios.append(p)
+        ESTADISTICAS["textos"] += len(protegidos)
+        ESTADISTICAS["unicos"] += len(propios)
+
+    traducidos: list[str | None] = []
     try:
-        time.sleep(DELAY)
-        trad = tr.translate(protegido)
-        if trad is None:
-            raise ValueError("vacío")
-    except Exception as exc:
-        print(f"      ░ traducción fallida: {exc}")
-        trad = protegido
+        if propios:
+            traducidos = _traduce_unicos(propios, idioma, barra, avisa)
+    finally:
+        # las traducciones fallidas no se memorizan: un duplicado posterior
+        # vuelve a intentarlo
+        with _lock_memo:
+            for p, t in zip(propios, traducidos):
+                if t is not None:
+                    _memo[idioma, p] = t
+            for p in propios:
+                _en_curso.pop((idioma, p)).set()
+    for evento in ajenos:
+        evento.wait()
+
+    # 3) Repartir a todas las posiciones
+    return [_memo.get((idioma, p)) for p in protegidos]
 
-    # 4) Quitar {{{...}}}
-    return re.sub(r"\{\{\{.*?\}\}\}", lambda m: m.group(0)[3:-3], trad)
+
+def traduce_textos(
+    textos: list[str], idioma: str = DESTINO, barra: bool = True
+) -> list[str]:
+    protegidos = [protege(t) for t in textos]
+    trads = traduce_protegidos([p.texto for p in protegidos], idioma, barra)
+    return [restaura(p, t, o, idioma) for p, t, o in zip(protegidos, trads, textos)]
 
 
 def ya_esta_traducido(orig: Path, trad: Path) -> bool:
@@ -108,13 +802,17 @@ def ya_esta_traducido(orig: Path, trad: Path) -> bool:
         return sum(1 for _ in f1) == sum(1 for _ in f2)
 
 
-def nombre_traducido(ruta: Path) -> str:
+def carpeta_idioma(idioma: str) -> str:
+    return CARPETAS_IDIOMA.get(idioma, idioma)
+
+
+def nombre_traducido(ruta: Path, idioma: str = DESTINO) -> str:
     base = ruta.with_suffix("").name
-    for suf in (".en", "_en", "-en", "en_US"):
+    for suf in SUFIJOS_EN:
         if base.endswith(suf):
             base = base[: -len(suf)]
             break
-    return base + "_esp" + ruta.suffix
+    return base + "_" + carpeta_idioma(idioma) + ruta.suffix
 
 
 def mover_originales_al_final(originales: list[Path]) -> None:
@@ -127,97 +825,725 @@ def mover_originales_al_final(originales: list[Path]) -> None:
             print(f"      → movido a en/: {destino}")
 
 
-def traduce_archivo(ruta: Path) -> Path | None:
-    carpeta_es = ruta.parent / SUB_DIR_ES
-    carpeta_es.mkdir(exist_ok=True)
-    ruta_trad = carpeta_es / nombre_traducido(ruta)
+# estado de situacion(): traducido antes de existir el manifiesto
+ADOPTABLE = "adoptable"
 
-    if ya_esta_traducido(ruta, ruta_trad):
-        print(f"  ⏩  {ruta.parent.name}/{ruta.name}  ->  ya traducido")
+
+def situacion(ruta: Path, idioma: str) -> tuple[str, dict[str, str]]:
+    """(estado, cues reutilizables) de la traducción de `ruta` a `idioma`, sin
+    escribir nada en disco.
+
+    Cuesta un stat y una búsqueda en el manifiesto; los archivos traducidos
+    antes de existir el manifiesto (sin registro de cues) son ADOPTABLE si
+    tienen las mismas líneas que su traducción.
+    """
+    carpeta = ruta.parent / carpeta_idioma(idioma)
+    salida = carpeta / nombre_traducido(ruta, idioma)
+    estado = manifiesto_de(carpeta).estado(ruta, salida, FIRMA)
+    previas: dict[str, str] = {}
+    if estado == NUEVO:
+        if ruta_registro(carpeta, ruta).exists():
+            # quedó pendiente por cues fallidos: sólo se piden esos
+            previas = lee_registro(carpeta, ruta, FIRMA)
+        elif ya_esta_traducido(ruta, salida):
+            estado = ADOPTABLE
+    # --incremental: si sólo cambió el original, los cues que siguen igual
+    # reutilizan la traducción anterior y sólo se envían los nuevos/editados
+    if INCREMENTAL and estado == CAMBIADO:
+        previas = lee_registro(carpeta, ruta, FIRMA)
+    # --resume: lo que llegó al registro parcial antes del corte no se vuelve
+    # a pedir (los archivos terminados ya los salta el manifiesto)
+    if REANUDA and estado not in (AL_DIA, ADOPTABLE):
+        previas.update(lee_parcial(carpeta, ruta, FIRMA))
+    return estado, previas
+
+
+class _Salida:
+    """Estado de la traducción de un archivo a uno de los idiomas de destino."""
+
+    def __init__(self, ruta: Path, idioma: str) -> None:
+        self.idioma = idioma
+        self.carpeta = ruta.parent / carpeta_idioma(idioma)
+        self.carpeta.mkdir(exist_ok=True)
+        self.ruta = self.carpeta / nombre_traducido(ruta, idioma)
+        self.manifiesto = manifiesto_de(self.carpeta)
+        self.sin_traducir = 0
+        self.atomico: EscritorAtomico | None = None
+        self.escritor: EscritorSubtitulos | None = None
+        self.registro: EscritorRegistro | None = None
+        self.estado, self.previas = situacion(ruta, idioma)
+        if self.estado == ADOPTABLE:
+            self.manifiesto.registra(ruta, self.ruta, FIRMA)
+            self.estado = AL_DIA
+
+    def traduce(
+        self, textos: list[str], protegidos: list[Protegido], grupos: list[list[int]]
+    ) -> list[str]:
+        """Traduce los cues de una ventana; `grupos` son los índices de los
+        cues de cada frase (ver agrupa_frases()).
+
+        Cada frase se anota en el registro en cuanto vuelve su petición, no al
+        terminar la ventana: así los checkpoints del registro parcial siguen
+        el ritmo de las peticiones."""
+        salida = [self.previas.get(t, t) for t in textos]
+        # una frase se traduce entera si alguno de sus cues no se puede
+        # reutilizar
+        nuevos = [g for g in grupos if any(textos[i] not in self.previas for i in g)]
+        en_nuevos = {i for g in nuevos for i in g}
+        for i, texto in enumerate(textos):
+            if i not in en_nuevos:
+                self.registro.anota(texto, salida[i])
+        frases = [
+            protegidos[g[0]] if len(g) == 1 else concatena([protegidos[i] for i in g])
+            for g in nuevos
+        ]
+        de_frase: dict[str, list[int]] = defaultdict(list)
+        for n, frase in enumerate(frases):
+            de_frase[frase.texto].append(n)
+        # frase → traducción de cada uno de sus cues (None: no se pudo repartir)
+        resueltas: dict[int, list[str] | None] = {}
+        lock = threading.Lock()
+
+        def resuelve(texto: str, trad: str) -> None:
+            # se llama desde el hilo que recibió la petición y, al final, con
+            # todo lo de la ventana (lo que venía de la memoria, de otro
+            # worker...): cada frase se resuelve una sola vez
+            for n in de_frase[texto]:
+                g = nuevos[n]
+                with lock:
+                    if n in resueltas:
+                        continue
+                    if len(g) == 1:
+                        partes = [restaura(frases[n], trad, textos[g[0]], self.idioma)]
+                    else:
+                        partes = reparte_frase(
+                            frases[n], trad, [textos[i] for i in g], self.idioma
+                        )
+                    resueltas[n] = partes
+                for i, parte in zip(g, partes or ()):
+                    self.registro.anota(textos[i], parte)
+
+        trads = traduce_protegidos(
+            [f.texto for f in frases], self.idioma, False, resuelve
+        )
+        sueltos: list[int] = []  # cues de frases que no se pudieron repartir
+        fallidos = 0
+        for n, (g, frase, trad) in enumerate(zip(nuevos, frases, trads)):
+            if trad is None:
+                fallidos += len(g)
+                continue
+            resuelve(frase.texto, trad)
+            if resueltas[n] is None:
+                sueltos.extend(g)
+            else:
+                for i, parte in zip(g, resueltas[n]):
+                    salida[i] = parte
+        if sueltos:
+            for i, trad in zip(
+                sueltos,
+                traduce_protegidos(
+                    [protegidos[i].texto for i in sueltos], self.idioma, False
+                ),
+            ):
+                fallidos += trad is None
+                salida[i] = restaura(protegidos[i], trad, textos[i], self.idioma)
+                if trad is not None:
+                    self.registro.anota(textos[i], salida[i])
+        unidos = [g for g in nuevos if len(g) > 1]
+        with _lock_memo:
+            ESTADISTICAS["cues"] += sum(map(len, nuevos))
+            ESTADISTICAS["reutilizados"] += len(textos) - sum(map(len, nuevos))
+            ESTADISTICAS["frases"] += len(unidos)
+            ESTADISTICAS["cues_unidos"] += sum(map(len, unidos))
+            self.sin_traducir += fallidos
+        return salida
+
+
+def _inicia_proceso(
+    usar_dict: bool,
+    unir_frases: bool = True,
+    dominios: list[str] | None = None,
+    tope: int = LOTE_MAX_CHARS,
+) -> None:
+    """Inicializa los procesos de --plan y --procs: con "spawn" (Windows,
+    macOS) el hijo importa este módulo con los valores por defecto, así que
+    las opciones que usan se pasan aquí y el diccionario y los glosarios se
+    compilan aquí."""
+    global USAR_DICT, DOMINIOS, UNIR_FRASES, TOPE_PETICION, PROTECTOR
+    UNIR_FRASES = unir_frases
+    TOPE_PETICION = tope
+    dominios = dominios or []
+    if (usar_dict, dominios) != (USAR_DICT, DOMINIOS):
+        USAR_DICT, DOMINIOS = usar_dict, dominios
+        PROTECTOR = compila_protector(USAR_DICT, DOMINIOS)
+
+
+def necesita_traduccion(ruta: Path) -> bool:
+    """Si a algún idioma le falta la traducción según su manifiesto (un stat
+    por idioma; no lee el archivo)."""
+    for idioma in DESTINOS:
+        carpeta = ruta.parent / carpeta_idioma(idioma)
+        salida = carpeta / nombre_traducido(ruta, idioma)
+        if manifiesto_de(carpeta).estado(ruta, salida, FIRMA) != AL_DIA:
+            return True
+    return False
+
+
+def prepara(ruta: Path) -> tuple[list[tuple], list[tuple | None]]:
+    """Lee y protege `ruta` en un proceso de --procs.
+
+    Devuelve los elementos en forma compacta (ver a_tupla) y, por cada cue con
+    texto, (texto protegido, originales) o None si no había nada que proteger
+    (el caso más común: así el texto no viaja dos veces).
+    """
+    elementos: list[tuple] = []
+    protegidos: list[tuple | None] = []
+    for e in lee_subtitulos(ruta, ENCODING):
+        elementos.append(a_tupla(e))
+        if isinstance(e, Cue) and (texto := e.texto):
+            p = protege(texto)
+            protegidos.append(tuple(p) if p.originales else None)
+    return elementos, protegidos
+
+
+def reparte_frase(
+    frase: Protegido, trad: str, textos: list[str], idioma: str = DESTINO
+) -> list[str] | None:
+    """Reparte la traducción de una frase entre sus cues (en proporción al
+    largo de cada original y con tantas líneas como tenía); None si salen
+    menos palabras que cues."""
+    texto, reparadas = repara_marcas(trad, len(frase.originales))
+    trozos = reparte(texto, [len(t) for t in textos])
+    if trozos is None:
         return None
+    if reparadas:
+        with _lock_memo:
+            ESTADISTICAS["marcas_reparadas"] += reparadas
+    originales = PROTECTOR.en_idioma(frase.originales, idioma)
+    # las marcas cuentan como una palabra al partir en líneas: un original
+    # con espacios ("Result<T, E>") no se parte
+    return [
+        sustituye_marcas(equilibra_lineas(trozo, t.count("\n") + 1), originales)
+        for trozo, t in zip(trozos, textos)
+    ]
+
 
+def traduce_archivo(
+    ruta: Path, barra: bool = True, preparado: Future | None = None
+) -> list[Path]:
+    """Traduce `ruta` a todos los idiomas de destino.
+
+    Con `preparado` (--procs), el archivo ya viene leído y protegido por un
+    proceso del pool (ver prepara()) y aquí sólo se traduce y se escribe.
+    """
+    from tqdm import tqdm
+
+    salidas = [_Salida(ruta, idioma) for idioma in DESTINOS]
+    salidas = [s for s in salidas if s.estado != AL_DIA]
+    if not salidas:
+        if preparado is not None:
+            preparado.cancel()
+        print(f"  ⏩  {ruta.parent.name}/{ruta.name}  ->  ya traducido")
+        return []
     print(f"\n  >>> {ruta.parent.name}/{ruta.name}")
 
-    lineas_out = []
-    buffer = []
+    # Se lee y escribe en streaming: sólo se retiene la ventana de cues que
+    # está en traducción (~VENTANA_CHARS), no el archivo entero. Al traductor
+    # sólo llega el texto de los cues; cabeceras, NOTE/STYLE/REGION y
+    # time-codes se copian tal cual. Cada ventana se protege UNA vez y se
+    # reparte entre todos los idiomas de destino a la vez
+    ventana: list[Elemento] = []
+    chars = 0
+    n_cues = 0  # pbar no cuenta si está desactivada (--workers > 1)
+    formato = formato_de(ruta)
+    tiempos = dict.fromkeys(FASES, 0.0)  # segundos por fase, para --metrics
 
-    def vacia_buffer():
-        if not buffer:
-            return
-        texto = "".join(buffer).strip()
-        if texto:
-            trad = traduce_bloque(texto)
-            lineas_out.append(trad + "\n")
-        buffer.clear()
+    with ExitStack() as pila:
+        for s in salidas:
+            s.atomico = EscritorAtomico(s.ruta, ENCODING)
+            f = pila.enter_context(s.atomico)
+            s.escritor = EscritorSubtitulos(f, formato)
+            s.registro = pila.enter_context(
+                EscritorRegistro(s.carpeta, ruta, FIRMA, conserva=REANUDA)
+            )
+        pbar = pila.enter_context(tqdm(unit="cues", leave=False, disable=not barra))
 
-    for lin in tqdm(
-        ruta.read_text(encoding=ENCODING).splitlines(True), unit="líneas", leave=False
-    ):
-        if RE_META.match(lin):
-            vacia_buffer()
-            lineas_out.append(lin)
+        def vacia_ventana() -> None:
+            nonlocal chars, n_cues
+            cues = [e for e in ventana if isinstance(e, Cue) and e.texto]
+            textos = [c.texto for c in cues]
+            t0 = time.perf_counter()
+            protegidos = [protege_cue(t) for t in textos]
+            grupos = (
+                agrupa_frases(cues, TOPE_PETICION)
+                if UNIR_FRASES
+                else [[i] for i in range(len(cues))]
+            )
+            t1 = time.perf_counter()
+            traducciones = list(
+                pool_idiomas().map(
+                    lambda s: s.traduce(textos, protegidos, grupos), salidas
+                )
+            )
+            t2 = time.perf_counter()
+            for s, trads in zip(salidas, traducciones):
+                trads_de = dict(zip(map(id, cues), trads))
+                for elemento in ventana:
+                    if id(elemento) in trads_de:
+                        elemento = elemento.con_texto(trads_de[id(elemento)])
+                    s.escritor.escribe(elemento)
+            tiempos["proteger"] += t1 - t0
+            tiempos["traducir"] += t2 - t1
+            tiempos["escribir"] += time.perf_counter() - t2
+            pbar.update(len(cues))
+            n_cues += len(cues)
+            ventana.clear()
+            chars = 0
+
+        t0 = time.perf_counter()
+        if preparado is None:
+            elementos = lee_subtitulos(ruta, ENCODING)
+            protege_cue = protege
         else:
-            buffer.append(lin)
-    vacia_buffer()
+            tuplas, previos = preparado.result()
+            elementos = map(de_tupla, tuplas)
+            it_previos = iter(previos)
+
+            def protege_cue(texto: str) -> Protegido:
+                previo = next(it_previos)
+                return Protegido(texto, ()) if previo is None else Protegido(*previo)
+
+        tiempos["leer"] += time.perf_counter() - t0
+        while True:
+            t0 = time.perf_counter()
+            elemento = next(elementos, None)
+            tiempos["leer"] += time.perf_counter() - t0
+            if elemento is None:
+                break
+            ventana.append(elemento)
+            if isinstance(elemento, Cue):
+                chars += len(elemento.texto)
+                if chars >= VENTANA_CHARS:
+                    vacia_ventana()
+        vacia_ventana()
+        # con cues fallidos no se publica una salida a medias (con esos cues
+        # en inglés, y pisando una traducción anterior): sólo queda el
+        # registro de cues, y el archivo se escribe cuando estén todos
+        for s in salidas:
+            if s.sin_traducir:
+                s.atomico.descarta()
+
+    for s in salidas:
+        if s.sin_traducir:
+            # no se registra en el manifiesto: se reintenta más tarde
+            print(
+                f"      ⚠ {s.sin_traducir} cues sin traducir: {s.ruta} "
+                "se escribirá cuando estén todos"
+            )
+            with _lock_memo:
+                if ruta not in PENDIENTES:
+                    PENDIENTES.append(ruta)
+            continue
+        s.manifiesto.registra(ruta, s.ruta, FIRMA)
+        print(f"      ✓ guardado: {s.ruta}")
+    METRICAS.archivo(
+        str(ruta),
+        cues=n_cues,
+        sin_traducir=sum(s.sin_traducir for s in salidas),
+        **tiempos,
+    )
+    return [s.ruta for s in salidas]
+
 
-    ruta_trad.write_text("".join(lineas_out), encoding=ENCODING)
-    print(f"      ✓ guardado: {ruta_trad}")
-    return ruta_trad
+def descubre(raiz: Path) -> Iterator[tuple[Path, bool]]:
+    """Recorre el árbol una sola vez con os.scandir y va entregando
+    (archivo, es_original_en) a medida que los encuentra.
 
+    Las carpetas en/ y las de salida (esp/, por/...) se descartan sin entrar
+    en ellas. Cada carpeta se entrega completa (en orden alfabético) antes de
+    bajar a sus subcarpetas, así los archivos salen agrupados por carpeta.
+    """
+    pendientes = [raiz]
+    while pendientes:
+        carpeta = pendientes.pop()
+        try:
+            with os.scandir(carpeta) as it:
+                entradas = sorted(it, key=lambda e: e.name)
+        except OSError as exc:
+            print(f"      ░ no se pudo leer {carpeta}: {exc}")
+            continue
+        subcarpetas = []
+        for e in entradas:
+            if e.is_dir(follow_symlinks=False):
+                if e.name not in CARPETAS_SALIDA:
+                    subcarpetas.append(Path(e.path))
+            elif e.name.lower().endswith(EXTENSIONES):
+                ruta = Path(e.path)
+                yield ruta, ruta.with_suffix("").name.endswith(SUFIJOS_EN)
+        pendientes.extend(reversed(subcarpetas))
 
-def main() -> None:
-    raiz = Path.cwd()
-    todos = [
-        p for p in raiz.rglob("*.vtt") if p.parent.name not in (SUB_DIR_EN, SUB_DIR_ES)
-    ] + [
-        p for p in raiz.rglob("*.srt") if p.parent.name not in (SUB_DIR_EN, SUB_DIR_ES)
+
+# ------------------ --plan ------------------
+# columnas del informe, por carpeta y en total
+COLUMNAS_PLAN = (
+    "archivos",  # con algún idioma por traducir
+    "al_dia",
+    "ilegibles",
+    "cues",
+    "reutilizados",  # --incremental/--resume/cues pendientes
+    "unicos",  # textos distintos a traducir (por idioma)
+    "en_memoria",  # ... de ellos, ya en la memoria de traducción
+    "caracteres",  # lo que se enviaría al traductor
+    "peticiones",
+)
+# latencia supuesta de una petición a Google para estimar el tiempo (el mock
+# usa la de --mock-latency)
+LATENCIA_SUPUESTA = 0.5
+
+
+def _analiza(ruta: Path) -> list[tuple[tuple[str, ...], str]] | None:
+    """(textos de los cues, texto protegido a enviar) de cada frase de `ruta`
+    (o de cada cue, con --no-merge); None si no se puede leer. Se ejecuta en
+    un proceso aparte."""
+    try:
+        cues = [
+            e for e in lee_subtitulos(ruta, ENCODING) if isinstance(e, Cue) and e.texto
+        ]
+    except (OSError, UnicodeDecodeError):
+        return None
+    grupos = (
+        agrupa_frases(cues, TOPE_PETICION)
+        if UNIR_FRASES
+        else [[i] for i in range(len(cues))]
+    )
+    return [
+        (
+            tuple(cues[i].texto for i in g),
+            (
+                concatena([protege(cues[i].texto) for i in g]).texto
+                if len(g) > 1
+                else protege(cues[g[0]].texto).texto
+            ),
+        )
+        for g in grupos
     ]
 
-    if not todos:
+
+def planifica(raiz: Path) -> dict:
+    """Lo que costaría traducir `raiz` con las opciones actuales, sin red.
+
+    Recorre el árbol, consulta los manifiestos, lee y protege cada archivo
+    pendiente en un pool de procesos y, ya en este proceso, descarta los
+    duplicados de toda la ejecución y lo que está en la memoria de traducción.
+    Las peticiones se cuentan empaquetando lo que queda como lo haría la
+    traducción real (por archivo o, con --workers > 1, entre archivos).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from memoria_traduccion import NOMBRE_DB
+
+    carpetas: dict[Path, dict[str, int]] = defaultdict(
+        lambda: dict.fromkeys(COLUMNAS_PLAN, 0)
+    )
+    # 1) Manifiestos: los archivos al día ni se abren
+    pendientes: list[tuple[Path, dict[str, dict[str, str]]]] = []
+    for ruta, _ in descubre(raiz):
+        previas_de = {}
+        for idioma in DESTINOS:
+            estado, previas = situacion(ruta, idioma)
+            if estado not in (AL_DIA, ADOPTABLE):
+                previas_de[idioma] = previas
+        if previas_de:
+            pendientes.append((ruta, previas_de))
+            carpetas[ruta.parent]["archivos"] += 1
+        else:
+            carpetas[ruta.parent]["al_dia"] += 1
+
+    # 2) Leer y proteger en paralelo; cada texto cuenta sólo la primera vez
+    #    que aparece (como _memo en la traducción real)
+    vistos: dict[str, set[str]] = {idioma: set() for idioma in DESTINOS}
+    nuevos: list[dict[str, list[str]]] = []  # por archivo: idioma → textos
+    procesos = os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        procesos,
+        initializer=_inicia_proceso,
+        initargs=(USAR_DICT, UNIR_FRASES, DOMINIOS, TOPE_PETICION),
+    ) as pool:
+        resultados = pool.map(
+            _analiza,
+            [ruta for ruta, _ in pendientes],
+            chunksize=max(1, min(64, len(pendientes) // (procesos * 4))),
+        )
+        for (ruta, previas_de), pares in zip(pendientes, resultados):
+            fila = carpetas[ruta.parent]
+            propios: dict[str, list[str]] = {}
+            nuevos.append(propios)
+            if pares is None:
+                fila["ilegibles"] += 1
+                continue
+            fila["cues"] += sum(len(textos) for textos, _ in pares)
+            for idioma, previas in previas_de.items():
+                lista = propios[idioma] = []
+                for textos, protegido in pares:
+                    if all(t in previas for t in textos):
+                        fila["reutilizados"] += len(textos)
+                    elif protegido not in vistos[idioma] and any(
+                        c.isalpha() for c in protegido
+                    ):
+                        vistos[idioma].add(protegido)
+                        lista.append(protegido)
+
+    # 3) Memoria de traducción (sólo lectura; si no existe, no se crea)
+    en_memoria: dict[str, set[str]] = {idioma: set() for idioma in DESTINOS}
+    if USAR_CACHE and (CACHE_DIR / NOMBRE_DB).exists():
+        mem = memoria()
+        for idioma in DESTINOS:
+            en_memoria[idioma] = mem.contiene(
+                vistos[idioma], ORIGEN, idioma, MODO_CACHE
+            )
+
+    # 4) Peticiones con el empaquetado actual
+    entre_archivos = WORKERS > 1 and MAX_CHARS_LOTE > 0
+    piezas_de: dict[str, list[str]] = {idioma: [] for idioma in DESTINOS}
+    for (ruta, _), propios in zip(pendientes, nuevos):
+        fila = carpetas[ruta.parent]
+        for idioma, lista in propios.items():
+            faltan = [p for p in lista if p not in en_memoria[idioma]]
+            piezas = [t for p in faltan for t in parte_texto(p, TOPE_PETICION)[0]]
+            fila["unicos"] += len(lista)
+            fila["en_memoria"] += len(lista) - len(faltan)
+            fila["caracteres"] += sum(map(len, piezas))
+            fila["peticiones"] += len(arma_lotes(piezas, MAX_CHARS_LOTE))
+            piezas_de[idioma] += piezas
+
+    total = {c: sum(f[c] for f in carpetas.values()) for c in COLUMNAS_PLAN}
+    if entre_archivos:
+        # por carpeta se cuenta como si se tradujera sola; en total, los
+        # paquetes se llenan con cues de varios archivos
+        total["peticiones"] = sum(
+            len(arma_lotes(piezas, MAX_CHARS_LOTE)) for piezas in piezas_de.values()
+        )
+
+    # 5) Tiempo: lo que permita el limitador (compartido por todos los
+    #    idiomas) o lo que tarden las peticiones en vuelo, lo que sea mayor
+    idiomas_activos = sum(1 for piezas in piezas_de.values() if piezas) or 1
+    en_vuelo = WORKERS * idiomas_activos
+    if BACKENDS[NOMBRE_BACKEND].concurrente:
+        en_vuelo *= EN_VUELO
+    latencia = LATENCIA_MOCK if NOMBRE_BACKEND == "mock" else LATENCIA_SUPUESTA
+    n = total["peticiones"]
+    segundos = max(
+        max(0, n - LIMITADOR.rafaga) / LIMITADOR.tasa_max, n * latencia / en_vuelo
+    )
+    return {
+        "carpetas": {str(c.relative_to(raiz)): f for c, f in sorted(carpetas.items())},
+        "total": total,
+        "segundos": round(segundos, 1),
+    }
+
+
+def imprime_plan(plan: dict) -> None:
+    cabecera = ("carpeta", *COLUMNAS_PLAN)
+    filas = [(c, *f.values()) for c, f in plan["carpetas"].items()]
+    filas.append(("TOTAL", *plan["total"].values()))
+    anchos = [
+        max(len(str(f[i])) for f in [cabecera, *filas]) for i in range(len(cabecera))
+    ]
+    for n, fila in enumerate([cabecera, *filas]):
+        if n == len(filas):  # antes del total
+            print("-" * (sum(anchos) + 2 * len(anchos)))
+        print(
+            f"{fila[0]:<{anchos[0]}}  "
+            + "  ".join(f"{v:>{a}}" for v, a in zip(fila[1:], anchos[1:]))
+        )
+    h, resto = divmod(int(plan["segundos"]), 3600)
+    print(
+        f"\nTiempo estimado: {h}:{resto // 60:02d}:{resto % 60:02d} "
+        f"({plan['total']['peticiones']} peticiones a {LIMITADOR.tasa_max:g}/s, "
+        f"idiomas: {','.join(DESTINOS)}, --batch-chars {MAX_CHARS_LOTE}, "
+        f"--workers {WORKERS})"
+    )
+
+
+def _cancela_al_interrumpir(*pools: Executor | None) -> Callable[..., bool]:
+    """Salida para ExitStack.push: si se sale por una excepción (Ctrl-C), se
+    cancela lo que los pools tienen encolado; si no, al cerrarlos se
+    esperaría a que terminara."""
+
+    def salida(tipo: type | None, *_: object) -> bool:
+        if tipo is not None:
+            for pool in pools:
+                if pool is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
+        return False
+
+    return salida
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Punto de entrada de la línea de comandos (`python -m traduce`)."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    from tqdm import tqdm
+
+    args = crea_parser().parse_args(argv)
+    configura(args)
+    if args.plan:
+        try:
+            imprime_plan(planifica(RAIZ))
+        finally:
+            cierra_recursos()
+        return
+    encontrados = METRICAS.cronometra_descubrir(descubre(RAIZ))
+    primero = next(encontrados, None)
+    if primero is None:
         print("No se encontraron archivos .vtt ni .srt para traducir.")
         return
 
-    # Agrupar por carpeta (orden alfabético)
-    carpetas = {}
-    for arch in todos:
-        carpetas.setdefault(arch.parent, []).append(arch)
-
-    total = len(todos)
-    print(f"Se encontraron {total} archivos en {len(carpetas)} carpetas\n")
+    originales_a_mover: list[Path] = []
+    futuros: list[Future] = []
+    carpetas: set[Path] = set()
 
-    # Barra global
+    # Barra global; el total crece mientras se recorre el árbol
     with tqdm(
-        total=total, desc="Total", unit="arch", position=0, leave=True
+        total=0, desc="Total", unit="arch", position=0, leave=True
     ) as pbar_global:
-        pbar_global.set_postfix(mod="dict+types" if USAR_DICT else "types-only")
-
-        # 1) Buscar ORIGINALES a mover DESPUÉS de traducir
-        candidatos = [
-            p
-            for p in Path.cwd().rglob("*.vtt")
-            if p.parent.name not in (SUB_DIR_EN, SUB_DIR_ES)
-        ] + [
-            p
-            for p in Path.cwd().rglob("*.srt")
-            if p.parent.name not in (SUB_DIR_EN, SUB_DIR_ES)
-        ]
-        originales_a_mover = [
-            p
-            for p in candidatos
-            if p.with_suffix("").name.endswith((".en", "_en", "-en", "en_US"))
-        ]
+        pbar_global.set_postfix(mod=MODO, idiomas=",".join(DESTINOS))
 
-        # 2) Procesar UNA carpeta completa antes de pasar a la siguiente
-        for carpeta, archivos in sorted(carpetas.items()):
+        def al_terminar(fut: Future, carpeta: Path) -> None:
+            if fut.cancelled():
+                return
             pbar_global.set_description(f"Total (carpeta: {carpeta.name})")
-            for archivo in archivos:
-                traduce_archivo(archivo)
-                pbar_global.update(1)
+            pbar_global.update(1)
 
-        # 3) Mover originales al final
+        # 1) Un único recorrido: cada archivo se encola en cuanto aparece, y
+        #    los ORIGINALES se apuntan para moverlos DESPUÉS de traducir.
+        #    Con --workers N se traducen hasta N archivos a la vez, en el
+        #    orden (por carpeta) en que se encontraron
+        #    Con --procs N, la lectura y la protección de cada archivo
+        #    pendiente se hacen en N procesos y los hilos sólo traducen y
+        #    escriben
+        try:
+            with ExitStack() as pila:
+                pool = pila.enter_context(ThreadPoolExecutor(max_workers=WORKERS))
+                preparador = cupos = None
+                if PROCESOS:
+                    # cola acotada: si los procesos van muy por delante de la
+                    # traducción, el recorrido espera
+                    cupos = threading.BoundedSemaphore(2 * PROCESOS + WORKERS)
+                    preparador = pila.enter_context(
+                        ProcessPoolExecutor(
+                            PROCESOS,
+                            # "spawn" también en Linux: hacer fork con hilos
+                            # en marcha no es seguro
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_inicia_proceso,
+                            initargs=(USAR_DICT, UNIR_FRASES, DOMINIOS, TOPE_PETICION),
+                        )
+                    )
+                # Ctrl-C: al salir del `with` los pools esperan lo que tienen
+                # encolado (todo el árbol); se cancela antes
+                pila.push(_cancela_al_interrumpir(pool, preparador))
+                for archivo, es_original in chain([primero], encontrados):
+                    if es_original:
+                        originales_a_mover.append(archivo)
+                    carpetas.add(archivo.parent)
+                    preparado = None
+                    if preparador is not None and necesita_traduccion(archivo):
+                        cupos.acquire()
+                        preparado = preparador.submit(prepara, archivo)
+                    fut = pool.submit(traduce_archivo, archivo, WORKERS == 1, preparado)
+                    if preparado is not None:
+                        fut.add_done_callback(lambda _: cupos.release())
+                    fut.add_done_callback(partial(al_terminar, carpeta=archivo.parent))
+                    futuros.append(fut)
+                    pbar_global.total += 1
+                    pbar_global.refresh()
+
+                tqdm.write(
+                    f"Se encontraron {len(futuros)} archivos "
+                    f"en {len(carpetas)} carpetas\n"
+                )
+                for fut in futuros:
+                    fut.result()
+
+            # 2) Pasadas de reintento para los cues que fallaron, cuando el
+            #    traductor vuelve a aceptar peticiones
+            for pasada in range(PASADAS_REINTENTO):
+                if not PENDIENTES:
+                    break
+                pendientes = PENDIENTES[:]
+                PENDIENTES.clear()
+                INTERRUPTOR.espera()
+                tqdm.write(
+                    f"\nReintentando {len(pendientes)} archivos con cues sin "
+                    f"traducir (pasada {pasada + 1})"
+                )
+                with ExitStack() as pila:
+                    pool = pila.enter_context(ThreadPoolExecutor(max_workers=WORKERS))
+                    pila.push(_cancela_al_interrumpir(pool))
+                    for fut in [
+                        pool.submit(traduce_archivo, archivo, WORKERS == 1)
+                        for archivo in pendientes
+                    ]:
+                        fut.result()
+        finally:
+            # aunque la ejecución se corte, lo terminado queda en el
+            # manifiesto y en la memoria para --resume
+            guarda_manifiestos()
+            cierra_recursos()
+            METRICAS.cierra()
+
+        # 3) Mover originales al final, cuando ya terminaron todos los workers
         print("\nMoviendo archivos originales a sus carpetas 'en/' ...")
-        mover_originales_al_final(originales_a_mover)
+        # (los que quedaron con cues sin traducir se quedan donde están para
+        # que la próxima ejecución los encuentre)
+        mover_originales_al_final(
+            [o for o in originales_a_mover if o not in PENDIENTES]
+        )
 
+    textos, unicos = ESTADISTICAS["textos"], ESTADISTICAS["unicos"]
+    if textos:
+        print(
+            f"\nCues: {ESTADISTICAS['cues']} · textos a traducir (frases o cues "
+            f"sueltos): {textos} · únicos: {unicos} · evitados por duplicados: "
+            f"{textos - unicos} ({1 - unicos / textos:.0%})"
+        )
+    if ESTADISTICAS["marcas_reparadas"]:
+        print(
+            "Marcas de texto protegido reparadas (perdidas o duplicadas por el "
+            f"traductor): {ESTADISTICAS['marcas_reparadas']}"
+        )
+    if ESTADISTICAS["reutilizados"]:
+        print(
+            f"Cues reutilizados (--incremental/--resume): "
+            f"{ESTADISTICAS['reutilizados']}"
+        )
+    if ESTADISTICAS["frases"]:
+        print(
+            f"Cues unidos en frases completas: {ESTADISTICAS['cues_unidos']} "
+            f"(en {ESTADISTICAS['frases']} frases)"
+        )
+    if ESTADISTICAS["partidos"]:
+        print(
+            "Cues demasiado largos para una petición, partidos por frases: "
+            f"{ESTADISTICAS['partidos']}"
+        )
+    if INTERRUPTOR.aperturas:
+        print(f"Pausas por limitación del traductor: {INTERRUPTOR.aperturas}")
+    if PENDIENTES:
+        print(
+            f"⚠ {len(PENDIENTES)} archivos quedaron con cues sin traducir; "
+            "se reintentarán en la próxima ejecución"
+        )
+    if SALIDA_METRICAS:
+        resumen = json.dumps(METRICAS.resumen(), ensure_ascii=False, indent=1)
+        if SALIDA_METRICAS == "-":
+            print(resumen)
+        else:
+            Path(SALIDA_METRICAS).write_text(resumen + "\n", encoding="utf-8")
+            print(f"Métricas guardadas en {SALIDA_METRICAS}")
     print("\n¡Traducción y reorganización finalizadas!")
 
 
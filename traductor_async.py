@@ -0,0 +1,247 @@
+"""
+Cliente asyncio para el endpoint móvil de Google Translate (el mismo que usa
+deep-translator), con conexiones HTTP/1.1 keep-alive reutilizadas y hasta
+`en_vuelo` peticiones simultáneas.
+
+Ofrece la misma interfaz que `GoogleTranslator` (`translate`,
+`translate_batch`) para poder usarlo desde código síncrono: el event loop
+corre en un hilo propio y las llamadas se despachan a él.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import html
+import re
+import ssl
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from limitador import LimitadorTasa
+from metricas import Metricas
+from reintentos import Interruptor, PoliticaReintentos
+
+URL_GOOGLE = "https://translate.google.com/m"
+USER_AGENT = "Mozilla/5.0 (traduce-subtitulos)"
+RE_RESULTADO = re.compile(
+    r'<div class="(?:result-container|t0)">(.*?)</div>', re.DOTALL | re.IGNORECASE
+)
+RE_ETIQUETA = re.compile(r"<[^>]+>")
+
+
+class ErrorHTTP(RuntimeError):
+    def __init__(self, estado: int) -> None:
+        super().__init__(f"HTTP {estado}")
+        self.estado = estado
+
+
+class DemasiadasPeticiones(ErrorHTTP):
+    """HTTP 429: el servidor está limitando."""
+
+
+class _PoolHTTP:
+    """Conexiones keep-alive a un único host, reutilizadas entre peticiones."""
+
+    def __init__(self, url: str, timeout: float) -> None:
+        partes = urlsplit(url)
+        self.host = partes.hostname or "localhost"
+        self.tls = partes.scheme == "https"
+        self.puerto = partes.port or (443 if self.tls else 80)
+        self.ruta = partes.path or "/"
+        self.timeout = timeout
+        self.abiertas = 0  # conexiones creadas en total (para pruebas/diagnóstico)
+        self._libres: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def _abre(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        ctx = ssl.create_default_context() if self.tls else None
+        conexion = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.puerto, ssl=ctx), self.timeout
+        )
+        self.abiertas += 1
+        return conexion
+
+    async def get(self, consulta: dict[str, str]) -> tuple[int, str]:
+        peticion = (
+            f"GET {self.ruta}?{urlencode(consulta)} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Accept-Encoding: identity\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("ascii")
+
+        # una conexión reutilizada puede haberla cerrado el servidor: un
+        # único reintento con una conexión nueva
+        if self._libres:
+            conexion = self._libres.pop()
+            try:
+                return await self._envia(conexion, peticion)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                pass
+        return await self._envia(await self._abre(), peticion)
+
+    async def _envia(
+        self,
+        conexion: tuple[asyncio.StreamReader, asyncio.StreamWriter],
+        peticion: bytes,
+    ) -> tuple[int, str]:
+        reader, writer = conexion
+        try:
+            writer.write(peticion)
+            await writer.drain()
+            estado, cuerpo, seguir = await asyncio.wait_for(
+                self._lee_respuesta(reader), self.timeout
+            )
+        except BaseException:
+            writer.close()
+            raise
+        if seguir:
+            self._libres.append(conexion)
+        else:
+            writer.close()
+        return estado, cuerpo
+
+    @staticmethod
+    async def _lee_respuesta(reader: asyncio.StreamReader) -> tuple[int, str, bool]:
+        linea = await reader.readline()
+        if not linea:
+            raise ConnectionResetError("conexión cerrada por el servidor")
+        estado = int(linea.split()[1])
+
+        cabeceras: dict[str, str] = {}
+        while (linea := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            clave, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[clave.strip().lower()] = valor.strip()
+
+        seguir = cabeceras.get("connection", "").lower() != "close"
+        if "chunked" in cabeceras.get("transfer-encoding", "").lower():
+            trozos = []
+            while tam := int((await reader.readline()).split(b";")[0], 16):
+                trozos.append(await reader.readexactly(tam))
+                await reader.readline()
+            await reader.readline()
+            cuerpo = b"".join(trozos)
+        elif "content-length" in cabeceras:
+            cuerpo = await reader.readexactly(int(cabeceras["content-length"]))
+        else:
+            cuerpo, seguir = await reader.read(), False
+        return estado, cuerpo.decode("utf-8", "replace"), seguir
+
+    def cierra(self) -> None:
+        for _, writer in self._libres:
+            writer.close()
+        self._libres.clear()
+
+
+class GoogleAsync:
+    def __init__(
+        self,
+        source: str = "en",
+        target: str = "es",
+        en_vuelo: int = 4,
+        limitador: LimitadorTasa | None = None,
+        url: str = URL_GOOGLE,
+        timeout: float = 30.0,
+        metricas: Metricas | None = None,
+        reintentos: PoliticaReintentos | None = None,
+        interruptor: Interruptor | None = None,
+    ) -> None:
+        self.source = source
+        self.target = target
+        self.limitador = limitador
+        self.metricas = metricas
+        self.reintentos = reintentos
+        self.interruptor = interruptor
+        self._pool = _PoolHTTP(url, timeout)
+        self._en_vuelo = max(1, en_vuelo)
+        self._semaforo: asyncio.Semaphore | None = None
+        self._bucle = asyncio.new_event_loop()
+        threading.Thread(
+            target=self._bucle.run_forever, name="traductor-async", daemon=True
+        ).start()
+
+    @property
+    def conexiones_abiertas(self) -> int:
+        return self._pool.abiertas
+
+    async def translate_async(self, texto: str) -> str:
+        if not texto.strip():
+            return texto
+        intento = 0
+        while True:
+            try:
+                return await self._intenta(texto)
+            except Exception as exc:
+                if self.reintentos is None or not self.reintentos.reintenta(
+                    exc, intento
+                ):
+                    raise
+                if self.metricas is not None:
+                    self.metricas.reintento(type(exc).__name__)
+                # la espera se hace fuera del semáforo: no ocupa un hueco
+                await asyncio.sleep(self.reintentos.espera(intento))
+                intento += 1
+
+    async def _intenta(self, texto: str) -> str:
+        """Una sola petición (sin reintentos)."""
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self._en_vuelo)
+        async with self._semaforo:
+            if self.interruptor is not None:
+                await self.interruptor.espera_async()
+            if self.limitador is not None:
+                await self.limitador.adquiere_async()
+            inicio = time.perf_counter()
+            try:
+                estado, cuerpo = await self._pool.get(
+                    {"sl": self.source, "tl": self.target, "q": texto.strip()}
+                )
+                if estado == 429:
+                    raise DemasiadasPeticiones(estado)
+                if estado != 200:
+                    raise ErrorHTTP(estado)
+                encontrado = RE_RESULTADO.search(cuerpo)
+                if encontrado is None:
+                    raise ValueError("respuesta sin traducción")
+            except Exception as exc:
+                if self.metricas is not None:
+                    self.metricas.peticion(
+                        time.perf_counter() - inicio, texto, None, exc, self.target
+                    )
+                if self.limitador is not None:
+                    self.limitador.fallo()
+                if self.interruptor is not None:
+                    self.interruptor.fallo(exc)
+                raise
+        trad = html.unescape(RE_ETIQUETA.sub("", encontrado.group(1))).strip()
+        if self.metricas is not None:
+            self.metricas.peticion(
+                time.perf_counter() - inicio, texto, trad, None, self.target
+            )
+        if self.limitador is not None:
+            self.limitador.exito()
+        if self.interruptor is not None:
+            self.interruptor.exito()
+        return trad
+
+    async def translate_batch_async(self, textos: list[str]) -> list[str | Exception]:
+        """Lanza todas las peticiones a la vez; los errores se devuelven en su
+        posición en lugar de propagarse."""
+        return await asyncio.gather(
+            *(self.translate_async(t) for t in textos), return_exceptions=True
+        )
+
+    # ---- interfaz síncrona, compatible con GoogleTranslator ----
+    def translate(self, texto: str) -> str:
+        return asyncio.run_coroutine_threadsafe(
+            self.translate_async(texto), self._bucle
+        ).result()
+
+    def translate_batch(self, textos: list[str]) -> list[str | Exception]:
+        return asyncio.run_coroutine_threadsafe(
+            self.translate_batch_async(textos), self._bucle
+        ).result()
+
+    def cierra(self) -> None:
+        self._bucle.call_soon_threadsafe(self._pool.cierra)
+        self._bucle.call_soon_threadsafe(self._bucle.stop)